@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from mock_site import MockSite
+
+PATHS = ['scrape', 'wikiscrap', 'product', 'api']
+
+# Each driver prepares one scraper path and returns (url kind, fetch(url) -> error or None).
+# Imports happen here so a path whose dependencies are missing is skipped, not fatal.
+
+def scrape_driver(args, workdir):
+    # visualizer/scrape batch mode: robots.txt check, per-host slot, streaming extraction
+    sys.path.append(os.path.join(ROOT, 'visualizer'))
+    import scrape
+    host_limiter = scrape.HostLimiter(args.concurrency)
+
+    def fetch(url):
+        record = scrape.scrape_record(url, host_limiter, not args.ignore_robots)
+        return None if record['status'] == 'ok' else record.get('error', record['status'])
+    return 'wiki', fetch
+
+def wikiscrap_driver(args, workdir):
+    # web_scrapper/python_wikiscrap: conditional GET through the response cache, then the
+    # single-pass content + link extraction. The module reads config.json from the working
+    # directory at import, so it is imported from a scratch directory with its own cache.
+    with open(os.path.join(workdir, 'config.json'), 'w') as f:
+        json.dump({'cache_dir': os.path.join(workdir, 'http_cache')}, f)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        sys.path.append(os.path.join(ROOT, 'web_scrapper'))
+        import python_wikiscrap
+    finally:
+        os.chdir(cwd)
+
+    def fetch(url):
+        try:
+            html = python_wikiscrap.fetch_page(url)
+            if html is not None:
+                python_wikiscrap.parse_page(html, url)
+                python_wikiscrap.response_cache.commit(url)
+            return None
+        except Exception as e:
+            python_wikiscrap.response_cache.discard(url)
+            return str(e)
+    return 'wiki', fetch
+
+def product_driver(args, workdir):
+    from scripts.bs4_scraper import scrape_product_page
+
+    def fetch(url):
+        return scrape_product_page(url)['error']
+    return 'product', fetch
+
+def api_driver(args, workdir):
+    from scripts.utils import fetch_api_data
+
+    def fetch(url):
+        return None if fetch_api_data(url) is not None else 'no data'
+    return 'api', fetch
+
+DRIVERS = {
+    'scrape': scrape_driver,
+    'wikiscrap': wikiscrap_driver,
+    'product': product_driver,
+    'api': api_driver,
+}
+
+def percentile(sorted_values, share):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(round(share * (len(sorted_values) - 1))), len(sorted_values) - 1)]
+
+def timed(fetch, url):
+    started = time.perf_counter()
+    try:
+        error = fetch(url)
+    except Exception as e:
+        error = str(e)
+    return time.perf_counter() - started, error
+
+def run_path(fetch, urls, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda url: timed(fetch, url), urls))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for latency, _ in results)
+    errors = [error for _, error in results if error is not None]
+    return {
+        'requests': len(urls),
+        'seconds': round(elapsed, 3),
+        'pages_per_s': round(len(urls) / elapsed, 2) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 1) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1) if latencies else None,
+        'error_rate': round(len(errors) / len(urls), 4) if urls else 0.0,
+        'sample_errors': sorted(set(errors))[:3]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive each scraper path against the local mock site and report throughput.")
+    parser.add_argument('--paths', default=','.join(PATHS), help=f"Comma-separated subset of {', '.join(PATHS)}")
+    parser.add_argument('--requests', type=int, default=200, help="URLs fetched per path")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.02, help="Mock site latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--crawl-delay', type=int)
+    parser.add_argument('--rate', type=float, default=1000.0,
+                        help="Client rate limit per host in requests/s (the configured default is meant for real sites)")
+    parser.add_argument('--ignore-robots', action='store_true', help="Skip robots.txt in the scrape path")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    site = MockSite(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                    throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+                    crawl_delay=args.crawl_delay, seed=args.seed).start()
+    workdir = tempfile.mkdtemp(prefix='hrvst-load-')
+    report = {'site': {'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate,
+                       'throttle_rate': args.throttle_rate},
+              'concurrency': args.concurrency, 'paths': {}}
+    try:
+        try:
+            from scripts import http_client
+            http_client.configure(rate_limit={'rate': args.rate, 'burst': max(args.concurrency, 1)},
+                                  pool_maxsize=max(args.concurrency, 20))
+        except ImportError as e:
+            print(f"HTTP client unavailable ({e.name}); every path needs it")
+            return
+        for name in [value.strip() for value in args.paths.split(',') if value.strip()]:
+            try:
+                kind, fetch = DRIVERS[name](args, workdir)
+            except ImportError as e:
+                report['paths'][name] = {'skipped': f"missing dependency ({e.name})"}
+                continue
+            before = site.stats()
+            result = run_path(fetch, site.urls(kind, args.requests), args.concurrency)
+            after = site.stats()
+            result['server_statuses'] = {str(status): after.get(status, 0) - before.get(status, 0) for status in after}
+            report['paths'][name] = result
+        report['rate_limiter'] = http_client.rate_limit_stats()
+    finally:
+        site.stop()
+
+    print(f"{'path':<10} {'requests':>8} {'pages/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}  server statuses")
+    for name, result in report['paths'].items():
+        if 'skipped' in result:
+            print(f"{name:<10} skipped: {result['skipped']}")
+            continue
+        print(f"{name:<10} {result['requests']:>8} {result['pages_per_s']:>9.1f} {result['p50_ms']:>8.1f} "
+              f"{result['p99_ms']:>8.1f} {result['error_rate']:>7.1%}  {result['server_statuses']}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
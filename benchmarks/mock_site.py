@@ -0,0 +1,207 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import synthetic
+
+class MockSite:
+    """Local stand-in for the sites the scrapers talk to.
+
+    Serves Wikipedia-like articles under /wiki/<Title>, product pages under /product/<n>,
+    a paginated JSON API under /api/items and a robots.txt. Articles link to further
+    articles, so crawls keep discovering pages. Every response except robots.txt can be
+    delayed (latency +/- jitter seconds), fail with a 500 (error_rate) or be throttled
+    with a 429 and Retry-After (throttle_rate). Faults come from a seeded RNG, so a run
+    is reproducible for a given request order.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=1, crawl_delay=None, sections=12, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.crawl_delay = crawl_delay
+        self.sections = sections
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.statuses = Counter()
+        self.server = ThreadingHTTPServer((host, port), MockHandler)
+        self.server.daemon_threads = True
+        self.server.site = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def fault(self):
+        # Returns (delay, status) for the next request; status is None for a normal response
+        with self._lock:
+            delay = max(self.latency + self._rng.uniform(-self.jitter, self.jitter), 0.0)
+            roll = self._rng.random()
+        if roll < self.throttle_rate:
+            return delay, 429
+        if roll < self.throttle_rate + self.error_rate:
+            return delay, 500
+        return delay, None
+
+    def record(self, status):
+        with self._lock:
+            self.statuses[status] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.statuses)
+
+    def robots_txt(self):
+        lines = ["User-agent: *", "Disallow: /private/"]
+        if self.crawl_delay:
+            lines.append(f"Crawl-delay: {self.crawl_delay}")
+        return "\n".join(lines) + "\n"
+
+    @lru_cache(maxsize=4096)
+    def wiki(self, title):
+        seed = int.from_bytes(hashlib.sha256(f"{self.seed}:{title}".encode('utf-8')).digest()[:8], 'big')
+        return synthetic.wiki_page(self.sections, seed, title.replace('_', ' '))
+
+    @lru_cache(maxsize=4096)
+    def product(self, number):
+        return synthetic.product_page(self.seed * 1000003 + number)
+
+    def items(self, page, size):
+        rng = random.Random(self.seed * 7919 + page)
+        return {
+            'page': page,
+            'size': size,
+            'next': page + 1,
+            'items': [{'id': page * size + i, 'name': synthetic.random_title(rng, 2),
+                       'value': round(rng.uniform(0, 1000), 2)} for i in range(size)]
+        }
+
+    def urls(self, kind, count):
+        # URLs a load run can request; article titles are drawn from the generator's vocabulary
+        rng = random.Random(self.seed)
+        if kind == 'wiki':
+            return [f"{self.base_url}/wiki/{synthetic.random_title(rng, 2).replace(' ', '_')}_{i}" for i in range(count)]
+        if kind == 'product':
+            return [f"{self.base_url}/product/{i}" for i in range(count)]
+        if kind == 'api':
+            return [f"{self.base_url}/api/items?page={i}&size=50" for i in range(count)]
+        raise ValueError(f"Unknown URL kind: {kind}")
+
+class MockHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 with Content-Length everywhere, so clients can keep connections alive
+    protocol_version = 'HTTP/1.1'
+    server_version = 'HRVSTMock/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        site = self.server.site
+        parsed = urlparse(self.path)
+        if parsed.path == '/robots.txt':
+            return self.send_body(200, site.robots_txt(), 'text/plain')
+
+        delay, status = site.fault()
+        if delay:
+            time.sleep(delay)
+        if status == 429:
+            return self.send_body(429, 'Too Many Requests', 'text/plain', {'Retry-After': str(site.retry_after)})
+        if status is not None:
+            return self.send_body(status, 'Internal Server Error', 'text/plain')
+
+        if parsed.path.startswith('/wiki/'):
+            body = site.wiki(unquote(parsed.path[len('/wiki/'):]))
+            return self.send_cached(body, 'text/html; charset=utf-8')
+        if parsed.path.startswith('/product/'):
+            try:
+                number = int(parsed.path[len('/product/'):])
+            except ValueError:
+                return self.send_body(404, 'Not Found', 'text/plain')
+            return self.send_cached(site.product(number), 'text/html; charset=utf-8')
+        if parsed.path == '/api/items':
+            query = parse_qs(parsed.query)
+            try:
+                page = int(query.get('page', ['0'])[0])
+                size = min(int(query.get('size', ['50'])[0]), 1000)
+            except ValueError:
+                return self.send_body(400, json.dumps({'error': 'page and size must be integers'}), 'application/json')
+            return self.send_body(200, json.dumps(site.items(page, size)), 'application/json')
+        if parsed.path == '/':
+            links = "".join(f'<li><a href="{url}">{url}</a></li>' for url in site.urls('wiki', 20) + site.urls('product', 20))
+            return self.send_body(200, f"<html><head><title>Mock site</title></head><body><ul>{links}</ul></body></html>",
+                                  'text/html; charset=utf-8')
+        return self.send_body(404, 'Not Found', 'text/plain')
+
+    def send_cached(self, body, content_type):
+        # Pages never change, so the ETag is stable and conditional requests get a 304
+        etag = '"%s"' % hashlib.sha1(body.encode('utf-8')).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            return self.send_body(304, '', content_type, {'ETag': etag})
+        return self.send_body(200, body, content_type, {'ETag': etag})
+
+    def send_body(self, status, body, content_type, headers=None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)) if status != 304 else '0')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(data)
+        self.server.site.record(status)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve generated wiki pages, product pages, robots.txt and a JSON API locally.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random +/- seconds around --latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of responses that are HTTP 500")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Share of responses that are HTTP 429")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument('--crawl-delay', type=int, help="Crawl-delay advertised in robots.txt")
+    parser.add_argument('--sections', type=int, default=12, help="Sections per generated article")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    site = MockSite(args.host, args.port, args.latency, args.jitter, args.error_rate, args.throttle_rate,
+                    args.retry_after, args.crawl_delay, args.sections, args.seed)
+    print(f"Serving on {site.base_url} (Ctrl+C to stop)")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import synthetic
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+CONFIG_PATH = os.path.join(ROOT, 'config', 'config.json')
+
+# Bundled datasets used by the CSV cases
+DATASETS = [
+    os.path.join(ROOT, 'visualizer', 'elden', 'elden_ring_steam_reviews.csv'),
+    os.path.join(ROOT, 'visualizer', 'freedommurica', 'hfi_cc_2018.csv'),
+    os.path.join(ROOT, 'visualizer', 'honey', 'honeyproduction.csv'),
+]
+SUNBURST_ROWS = 10000
+CHUNK_CHARS = 1 << 16
+
+class Case:
+    """One benchmark: run() is timed, setup() (if any) runs untimed before each repetition.
+
+    run() returns (items, payload_bytes): the records it produced and the size of what
+    would be handed on (a parsed frame, a chart payload, serialized scrape output).
+    """
+
+    def __init__(self, name, run, input_bytes, setup=None):
+        self.name = name
+        self.run = run
+        self.input_bytes = input_bytes
+        self.setup = setup
+
+def measure(case, repeat):
+    times = []
+    for _ in range(repeat):
+        if case.setup:
+            case.setup()
+        started = time.perf_counter()
+        items, payload_bytes = case.run()
+        times.append(time.perf_counter() - started)
+    # Separate run for memory, tracemalloc slows everything down.
+    # Only Python-level allocations are traced (numpy included, pyarrow buffers not).
+    if case.setup:
+        case.setup()
+    tracemalloc.start()
+    try:
+        case.run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    best = min(times)
+    return {
+        'seconds': round(best, 6),
+        'median_seconds': round(sorted(times)[len(times) // 2], 6),
+        'input_bytes': case.input_bytes,
+        'mb_per_s': round(case.input_bytes / best / 1e6, 3) if best else None,
+        'items': items,
+        'items_per_s': round(items / best, 1) if best else None,
+        'peak_bytes': peak,
+        'payload_bytes': payload_bytes
+    }
+
+def load_extraction_config():
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            return json.load(f).get('extraction', {})
+    except (OSError, ValueError):
+        return {}
+
+def html_inputs(scale):
+    pages = []
+    for name in sorted(os.listdir(FIXTURE_DIR)):
+        if name.startswith('wiki_') and name.endswith('.html'):
+            with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+                pages.append((name[:-5], synthetic.scale_html(f.read(), scale)))
+    return pages
+
+def csv_inputs(scale, workdir):
+    inputs = []
+    for path in DATASETS:
+        if not os.path.exists(path):
+            continue
+        name = os.path.splitext(os.path.basename(path))[0]
+        if scale > 1:
+            path = synthetic.scale_csv(path, os.path.join(workdir, f"{name}_x{scale}.csv"), scale)
+        inputs.append((name, path))
+    return inputs
+
+# Each builder returns the cases for one hot path at one scale
+
+def import_wikiscrap(workdir):
+    # python_wikiscrap reads config.json (and opens its log) in the working directory at
+    # import, so it is imported from the scratch directory with the repo's extraction
+    # settings. PostgreSQL is only contacted by save_to_postgresql, which is not timed.
+    with open(os.path.join(workdir, 'config.json'), 'w') as f:
+        json.dump({'cache_dir': os.path.join(workdir, 'http_cache'), 'extraction': load_extraction_config()}, f)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        sys.path.append(os.path.join(ROOT, 'web_scrapper'))
+        import python_wikiscrap
+    finally:
+        os.chdir(cwd)
+    return python_wikiscrap
+
+def wiki_extract_cases(scale, workdir):
+    # python_wikiscrap.extract_data (single page) and parse_page (crawl: content and links in one pass)
+    wikiscrap = import_wikiscrap(workdir)
+
+    def make_extract(page):
+        def run():
+            data = wikiscrap.extract_data(page)
+            return len(data), len(json.dumps(data).encode('utf-8'))
+        return run
+
+    def make_parse(page):
+        def run():
+            data, links = wikiscrap.parse_page(page, 'https://en.wikipedia.org/wiki/Benchmark')
+            return len(data) + len(links), len(json.dumps([data, links]).encode('utf-8'))
+        return run
+
+    cases = []
+    for name, page in html_inputs(scale):
+        cases.append(Case(f"wiki_extract[{name}]", make_extract(page), len(page.encode('utf-8'))))
+        cases.append(Case(f"wiki_parse[{name}]", make_parse(page), len(page.encode('utf-8'))))
+    return cases
+
+def page_scrape_cases(scale, workdir):
+    # visualizer/scrape.scrape_data after the download: chunked streaming parse, JSON output
+    from scripts.extraction import PAGE_FIELDS, collect_fields, compile_fields, extract_stream
+    fields = compile_fields(load_extraction_config().get('page', PAGE_FIELDS))
+
+    def make(page):
+        chunks = [page[i:i + CHUNK_CHARS] for i in range(0, len(page), CHUNK_CHARS)]
+        def run():
+            data = collect_fields(extract_stream(chunks, fields), fields)
+            return len(data.get('paragraphs') or []), len(json.dumps(data, indent=4).encode('utf-8'))
+        return run
+    return [Case(f"page_scrape[{name}]", make(page), len(page.encode('utf-8'))) for name, page in html_inputs(scale)]
+
+def product_extract_cases(scale, workdir):
+    # bs4_scraper.extract_product over scale copies of the product page
+    from scripts.extraction import compile_schema, extract_fields
+    with open(os.path.join(FIXTURE_DIR, 'product_page.html'), 'r', encoding='utf-8') as f:
+        page = f.read()
+    fields = compile_schema(load_extraction_config().get('product', {'title': 'h1.product-title', 'price': 'span.product-price'}))
+
+    def run():
+        payload = 0
+        for _ in range(scale):
+            payload += len(json.dumps(extract_fields(page, fields)))
+        return scale, payload
+    return [Case("product_extract", run, len(page.encode('utf-8')) * scale)]
+
+def csv_parse_cases(scale, workdir):
+    # The parse step of data_dashboard.load_uploaded_frame (the dashboard module runs Streamlit
+    # at import, so the columnar functions it calls are called directly)
+    from scripts.columnar import coerce_numeric, read_csv_buffer
+
+    def make(data):
+        def run():
+            df, _ = coerce_numeric(read_csv_buffer(data))
+            return len(df), int(df.memory_usage(deep=True).sum())
+        return run
+    cases = []
+    for name, path in csv_inputs(scale, workdir):
+        with open(path, 'rb') as f:
+            data = f.read()
+        cases.append(Case(f"csv_parse[{name}]", make(data), len(data)))
+    return cases
+
+def load_data_cases(scale, workdir):
+    # data_processing.load_data: cold includes the CSV -> Parquet conversion, warm reads the cache
+    from scripts import columnar
+    from scripts.data_processing import load_data
+
+    def clear_cache():
+        shutil.rmtree(columnar.CACHE_DIR, ignore_errors=True)
+
+    def make(path):
+        def run():
+            df = load_data(path)
+            if df is None:
+                raise RuntimeError(f"load_data failed for {path}")
+            return len(df), int(df.memory_usage(deep=True).sum())
+        return run
+    cases = []
+    for name, path in csv_inputs(scale, workdir):
+        size = os.path.getsize(path)
+        cases.append(Case(f"load_data_cold[{name}]", make(path), size, setup=clear_cache))
+        cases.append(Case(f"load_data_warm[{name}]", make(path), size))
+    return cases
+
+def sunburst_cases(scale, workdir):
+    # webapp analysis path: analyze_csv streams the upload, create_sunburst_chart builds the payload
+    from scripts.data_processing import analyze_csv, create_sunburst_chart
+    base = synthetic.write_sunburst_csv(os.path.join(workdir, 'sunburst.csv'), SUNBURST_ROWS)
+    path = synthetic.scale_csv(base, os.path.join(workdir, f"sunburst_x{scale}.csv"), scale) if scale > 1 else base
+
+    def run():
+        data_info, sunburst_df = analyze_csv(path)
+        if sunburst_df is None:
+            raise RuntimeError("analyze_csv found no sunburst columns")
+        return data_info['num_rows'], len(create_sunburst_chart(sunburst_df, 20).encode('utf-8'))
+    return [Case(f"sunburst[{SUNBURST_ROWS * scale}_rows]", run, os.path.getsize(path))]
+
+BUILDERS = [
+    wiki_extract_cases,
+    page_scrape_cases,
+    product_extract_cases,
+    csv_parse_cases,
+    load_data_cases,
+    sunburst_cases,
+]
+
+def compare(results, baseline, threshold):
+    # Returns the keys whose time or peak memory grew by more than threshold
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        if not before or 'seconds' not in result or 'seconds' not in before:
+            continue
+        result['baseline_seconds'] = before['seconds']
+        result['time_ratio'] = round(result['seconds'] / before['seconds'], 3) if before['seconds'] else None
+        result['memory_ratio'] = round(result['peak_bytes'] / before['peak_bytes'], 3) if before.get('peak_bytes') else None
+        if (result['time_ratio'] or 0) > 1 + threshold or (result['memory_ratio'] or 0) > 1 + threshold:
+            regressions.append(key)
+    return regressions
+
+def print_report(results):
+    print(f"{'case':<46} {'scale':>5} {'seconds':>9} {'MB/s':>8} {'items/s':>11} {'peak MB':>8} {'payload KB':>11} {'vs base':>8}")
+    for key, result in results.items():
+        name, scale = key.rsplit('@x', 1)
+        if 'skipped' in result:
+            print(f"{name:<46} {scale:>5}  skipped: {result['skipped']}")
+            continue
+        ratio = f"{result['time_ratio']:.2f}x" if result.get('time_ratio') else '-'
+        print(f"{name:<46} {scale:>5} {result['seconds']:>9.4f} {result['mb_per_s'] or 0:>8.2f} "
+              f"{result['items_per_s'] or 0:>11.0f} {result['peak_bytes'] / 1e6:>8.2f} "
+              f"{result['payload_bytes'] / 1e3:>11.1f} {ratio:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the parsing, extraction and charting hot paths.")
+    parser.add_argument('--scales', default='1,10', help="Comma-separated input multipliers, e.g. 1,10,100")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per case; the fastest is reported")
+    parser.add_argument('--only', help="Run only cases whose name contains this text")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Slowdown (or memory growth) that counts as a regression")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 if any case regressed")
+    parser.add_argument('--output', help="Also write the full results as JSON to this file")
+    parser.add_argument('--write-fixtures', action='store_true', help="Regenerate the saved HTML fixtures and exit")
+    args = parser.parse_args()
+
+    if args.write_fixtures:
+        for path in synthetic.write_fixtures(FIXTURE_DIR):
+            print(path)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='hrvst-bench-')
+    # Parquet conversions go to the scratch directory, not the shared data/columnar cache
+    os.environ['COLUMNAR_CACHE_DIR'] = os.path.join(workdir, 'columnar')
+    results = {}
+    try:
+        for scale in [int(value) for value in args.scales.split(',') if value.strip()]:
+            for builder in BUILDERS:
+                try:
+                    cases = builder(scale, workdir)
+                except ImportError as e:
+                    results[f"{builder.__name__[:-6]}@x{scale}"] = {'skipped': f"missing dependency ({e.name})"}
+                    continue
+                for case in cases:
+                    if args.only and args.only not in case.name:
+                        continue
+                    key = f"{case.name}@x{scale}"
+                    try:
+                        results[key] = measure(case, max(args.repeat, 1))
+                    except ImportError as e:
+                        results[key] = {'skipped': f"missing dependency ({e.name})"}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f).get('results', {})
+    regressions = compare(results, baseline, args.threshold)
+    print_report(results)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+        'regressions': regressions
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif baseline:
+        if regressions:
+            print(f"Regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        else:
+            print("No regressions against the baseline.")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import csv
+import html
+import os
+import random
+
+# Deterministic stand-ins for the pages and datasets the pipeline handles. The same seed
+# always produces the same bytes, so benchmark runs (and the mock site) are comparable.
+
+WORDS = (
+    "the of and in to a was is for on as by with from at that his which an were are "
+    "history war city river empire century population government university music film "
+    "album season league species church county district railway station island company "
+    "army battle party election school village family novel series team festival museum"
+).split()
+
+COUNTRIES = [
+    "Afghanistan", "Syria", "Venezuela", "Ukraine", "Eritrea", "Sudan", "Iraq", "Somalia",
+    "Myanmar", "Nigeria", "Colombia", "Iran", "Pakistan", "Ethiopia", "Yemen", "Congo",
+    "Germany", "Uganda", "Turkey", "Canada", "France", "Kenya", "Chad", "Italy", "Spain",
+    "Sweden", "Austria", "Greece", "Lebanon", "Jordan", "Egypt", "Brazil", "Peru", "Mexico"
+]
+
+def _sentence(rng, words=None):
+    words = words or rng.randint(8, 24)
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+def random_title(rng, words=2):
+    return " ".join(rng.choice(WORDS).capitalize() for _ in range(words))
+
+def _paragraph(rng, links=True):
+    parts = []
+    for _ in range(rng.randint(2, 6)):
+        sentence = html.escape(_sentence(rng))
+        if links and rng.random() < 0.6:
+            target = random_title(rng)
+            sentence += f' See <a href="/wiki/{target.replace(" ", "_")}" title="{target}">{target}</a>.'
+        if rng.random() < 0.3:
+            sentence += f'<sup class="reference"><a href="#cite_note-{rng.randint(1, 99)}">[{rng.randint(1, 99)}]</a></sup>'
+        parts.append(sentence)
+    return "<p>" + " ".join(parts) + "</p>"
+
+def wiki_page(sections=12, seed=0, title=None):
+    # A Wikipedia-like article: header chrome, infobox, headed sections with linked
+    # paragraphs, navboxes, category links and inline script/style
+    rng = random.Random(seed)
+    title = title or random_title(rng, 3)
+    body = [
+        '<div class="mw-parser-output">',
+        '<table class="infobox"><tbody>'
+        + "".join(f"<tr><th>{random_title(rng, 1)}</th><td>{html.escape(_sentence(rng, 4))}</td></tr>" for _ in range(8))
+        + "</tbody></table>",
+        _paragraph(rng),
+    ]
+    for _ in range(sections):
+        body.append(f'<h2><span class="mw-headline" id="s{rng.randint(0, 1 << 30)}">{random_title(rng)}</span></h2>')
+        for _ in range(rng.randint(1, 3)):
+            if rng.random() < 0.4:
+                body.append(f'<h3><span class="mw-headline">{random_title(rng)}</span></h3>')
+            body.extend(_paragraph(rng) for _ in range(rng.randint(1, 4)))
+            if rng.random() < 0.3:
+                body.append("<ul>" + "".join(f"<li>{html.escape(_sentence(rng, 6))}" for _ in range(5)) + "</ul>")
+    body.append('<div class="navbox">' + " ".join(
+        f'<a href="/wiki/{random_title(rng).replace(" ", "_")}">{random_title(rng)}</a>' for _ in range(40)) + "</div>")
+    body.append("</div>")
+    categories = "".join(f'<li><a href="/wiki/Category:{random_title(rng).replace(" ", "_")}">{random_title(rng)}</a></li>' for _ in range(6))
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="UTF-8"><title>{html.escape(title)} - Wikipedia</title>
+<meta name="description" content="{html.escape(_sentence(rng))}">
+<style>.mw-body {{ margin: 0 }} .infobox {{ float: right }}</style>
+<script>var wgPageName = "{title.replace(' ', '_')}"; var wgCategories = [];</script>
+</head><body>
+<div id="mw-head"><a href="/wiki/Main_Page">Main page</a> <a href="/wiki/Special:Random">Random article</a></div>
+<div id="content" class="mw-body"><h1 id="firstHeading">{html.escape(title)}</h1>
+<div id="mw-content-text">{"".join(body)}</div>
+<div id="catlinks"><ul>{categories}</ul></div></div>
+<script>(function () {{ for (var i = 0; i < 10; i++) {{ if (i < 5) {{}} }} }})();</script>
+</body></html>"""
+
+def product_page(seed=0, reviews=20):
+    rng = random.Random(seed)
+    name = random_title(rng, 3)
+    price = rng.randint(199, 99999) / 100
+    review_html = "".join(
+        f'<div class="review"><span class="stars">{rng.randint(1, 5)}</span><p>{html.escape(_sentence(rng))}</p></div>'
+        for _ in range(reviews))
+    return f"""<!DOCTYPE html>
+<html><head><title>{html.escape(name)} | Shop</title>
+<meta name="description" content="{html.escape(_sentence(rng))}"></head>
+<body><nav><a href="/">Home</a> <a href="/products">Products</a></nav>
+<main><div class="product"><h1 class="product-title">{html.escape(name)}</h1>
+<span class="product-price">${price:.2f}</span>
+<div class="description">{"".join(_paragraph(rng, links=False) for _ in range(3))}</div>
+<div class="reviews">{review_html}</div></div></main>
+<footer><p>&copy; Example Shop</p></footer></body></html>"""
+
+def scale_html(page, factor):
+    # Repeats the article body factor times, keeping one head and one closing tail
+    if factor <= 1:
+        return page
+    start = page.index('<div id="mw-content-text">') + len('<div id="mw-content-text">')
+    end = page.rindex('</div>', 0, page.index('<div id="catlinks">'))
+    body = page[start:end]
+    return page[:start] + body * factor + page[end:]
+
+def write_sunburst_csv(path, rows, seed=0):
+    # Asylum-decision rows with the columns create_sunburst_chart expects
+    rng = random.Random(seed)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Year', 'Country of origin', 'Country of asylum', 'Recognized decisions', 'Rejected decisions'])
+        for _ in range(rows):
+            writer.writerow([rng.randint(2000, 2023), rng.choice(COUNTRIES), rng.choice(COUNTRIES),
+                             rng.randint(0, 5000), rng.randint(0, 5000)])
+    return path
+
+def scale_csv(source, path, factor):
+    # The header once, then every data row factor times
+    with open(source, 'rb') as f:
+        header = f.readline()
+        rows = f.read()
+    if rows and not rows.endswith(b'\n'):
+        rows += b'\n'
+    with open(path, 'wb') as out:
+        out.write(header)
+        for _ in range(factor):
+            out.write(rows)
+    return path
+
+def write_fixtures(directory, pages=3):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for seed in range(pages):
+        path = os.path.join(directory, f"wiki_article_{seed}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(wiki_page(sections=12 + 8 * seed, seed=seed))
+        paths.append(path)
+    path = os.path.join(directory, "product_page.html")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(product_page())
+    paths.append(path)
+    return paths
@@ -1,13 +1,69 @@
-import requests
-from bs4 import BeautifulSoup
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from scripts import http_client, metrics
+from scripts.extraction import compile_schema, extract_fields, missing_fields
 
-def scrape_product_data(product_url):
-    response = requests.get(product_url)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, 'html.parser')
+CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.json'))
+
+# Used when config.json has no "extraction" -> "product" schema
+PRODUCT_SCHEMA = {
+    'title': 'h1.product-title',
+    'price': 'span.product-price'
+}
 
-    product_data = {}
-    product_data['title'] = soup.find('h1', class_='product-title').text.strip()  # Adjust selector
-    product_data['price'] = soup.find('span', class_='product-price').text.strip()  # Adjust selector
+@lru_cache(maxsize=None)
+def load_schema(name='product', config_path=CONFIG_PATH):
+    try:
+        with open(config_path, 'r') as f:
+            schema = json.load(f).get('extraction', {}).get(name)
+    except (OSError, ValueError):
+        schema = None
+    if schema is None and name == 'product':
+        schema = PRODUCT_SCHEMA
+    if schema is None:
+        raise KeyError(f"No extraction schema named {name!r}")
+    return schema
 
+def extract_product(html, schema=None):
+    fields = compile_schema(schema or load_schema())
+    with metrics.stage('extract', 'product'):
+        product_data = extract_fields(html, fields)
+    for name, value in product_data.items():
+        if isinstance(value, str):
+            product_data[name] = value.strip()
+        elif isinstance(value, list):
+            product_data[name] = [item.strip() for item in value]
+    return product_data, missing_fields(product_data)
+
+def scrape_product_data(product_url, schema=None):
+    response = http_client.get(product_url)
+    response.raise_for_status()
+
+    # Fields the page does not have come back as None instead of raising
+    product_data, missing = extract_product(response.text, schema)
+    if missing:
+        logging.warning("Missing fields %s on %s", missing, product_url)
     return product_data
+
+def scrape_product_page(product_url, schema=None):
+    try:
+        with metrics.stage('fetch', 'product'):
+            response = http_client.get(product_url)
+            response.raise_for_status()
+        product_data, missing = extract_product(response.text, schema)
+        metrics.increment('pages', component='product', outcome='ok')
+        return {'url': product_url, 'data': product_data, 'missing': missing, 'error': None}
+    except Exception as e:
+        metrics.increment('pages', component='product', outcome='error')
+        return {'url': product_url, 'data': None, 'missing': [], 'error': str(e)}
+
+def scrape_products(product_urls, schema=None, max_workers=8):
+    # Results are yielded in input order; the schema is compiled once for the whole batch
+    schema = schema or load_schema()
+    compile_schema(schema)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for result in executor.map(lambda url: scrape_product_page(url, schema), product_urls):
+            yield result
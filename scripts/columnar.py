@@ -0,0 +1,279 @@
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import pandas as pd
+
+# pyarrow is optional: without it datasets are read straight from CSV as before
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# COLUMNAR_CACHE_DIR points the cache elsewhere, e.g. a scratch directory for benchmarks
+CACHE_DIR = os.environ.get('COLUMNAR_CACHE_DIR') or os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'columnar'))
+# Size the cache may grow to before the least recently used files are removed
+CACHE_MAX_BYTES = int(os.environ.get('COLUMNAR_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+BATCH_ROWS = 100000
+# Bytes looked at to detect the CSV dialect
+SNIFF_BYTES = 64 * 1024
+# Schema metadata key for what write_frame's caller wants back with the frame
+METADATA_KEY = b'hrvst'
+# Bumped when the way CSVs are converted changes, so older cache files are rebuilt
+CACHE_FORMAT = 2
+
+def available():
+    return pa is not None
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def _path_prefix(path):
+    return hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+
+def file_key(path):
+    # Cheap identity for files on disk: a changed file gets a new key without hashing its bytes.
+    # Keys of the same path share a prefix, so copies of older versions can be found and removed.
+    stat = os.stat(path)
+    version = hashlib.sha256(f"{CACHE_FORMAT}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8')).hexdigest()[:32]
+    return f"{_path_prefix(path)}-{version}"
+
+def cache_path(key, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{key}.parquet")
+
+def _atomic_write(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _kind(dtype):
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'bool'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'int'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'float'
+    return 'text'
+
+def _merge_kind(a, b):
+    # Widens like a whole-file pd.read_csv: ints with floats (or gaps) are floats, anything else mixed is text
+    if a == b:
+        return a
+    if {a, b} <= {'int', 'float'}:
+        return 'float'
+    return 'text'
+
+PANDAS_DTYPES = {'bool': 'bool', 'int': 'int64', 'float': 'float64', 'text': str}
+
+def _csv_kinds(csv_path):
+    # First pass: column kinds over the whole file, chunk by chunk, so memory stays bounded
+    # Returns None for a file without data rows
+    kinds = None
+    for chunk in pd.read_csv(csv_path, chunksize=BATCH_ROWS):
+        if chunk.empty:
+            continue
+        chunk_kinds = {col: _kind(dtype) for col, dtype in chunk.dtypes.items()}
+        kinds = chunk_kinds if kinds is None else {col: _merge_kind(kinds[col], kind) for col, kind in chunk_kinds.items()}
+    return kinds
+
+def _write_csv_as_parquet(csv_path, parquet_path):
+    # Types are settled over the whole file before anything is written, then the file is
+    # streamed again with those types. Column names and dtypes match pd.read_csv, and
+    # reads from the cache need no further conversion.
+    kinds = _csv_kinds(csv_path)
+    if kinds is None:
+        # Header only: keep the columns, untyped as read_csv leaves them
+        pq.write_table(pa.Table.from_pandas(pd.read_csv(csv_path), preserve_index=False), parquet_path)
+        return
+    dtypes = {col: PANDAS_DTYPES[kind] for col, kind in kinds.items()}
+    schema = None
+    writer = None
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=BATCH_ROWS, dtype=dtypes):
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = pq.ParquetWriter(parquet_path, schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def _touch(path):
+    # The modification time doubles as last use for prune_cache
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def prune_cache(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, keep=None):
+    # Removes the least recently used Parquet files until the cache fits in max_bytes
+    try:
+        names = os.listdir(cache_dir)
+    except FileNotFoundError:
+        return 0
+    entries = []
+    for name in names:
+        if not name.endswith('.parquet'):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError as e:
+            logging.warning("Could not remove cached %s: %s", path, e)
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+def _remove_stale(csv_path, current, cache_dir):
+    # Copies of earlier versions of the same CSV are never read again
+    prefix = _path_prefix(csv_path) + '-'
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.startswith(prefix) and name.endswith('.parquet') and path != current:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logging.warning("Could not remove stale %s: %s", path, e)
+
+def discard(csv_path, cache_dir=CACHE_DIR):
+    # Drops the cached copies of a CSV that is about to be deleted
+    if os.path.isdir(cache_dir):
+        _remove_stale(csv_path, None, cache_dir)
+
+def ensure_parquet(csv_path, cache_dir=CACHE_DIR):
+    # Converts csv_path to Parquet once and returns the cached file, or None without pyarrow
+    if pa is None:
+        return None
+    path = cache_path(file_key(csv_path), cache_dir)
+    if os.path.exists(path):
+        _touch(path)
+        return path
+    _atomic_write(path, lambda tmp_path: _write_csv_as_parquet(csv_path, tmp_path))
+    logging.info("Cached %s as %s", csv_path, path)
+    _remove_stale(csv_path, path, cache_dir)
+    prune_cache(cache_dir, keep=path)
+    return path
+
+def write_frame(df, key, cache_dir=CACHE_DIR, metadata=None):
+    # Stores an already-parsed frame, plus an optional JSON-able dict for read_frame_metadata;
+    # returns the path, or None if it cannot be stored
+    if pa is None:
+        return None
+    path = cache_path(key, cache_dir)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if metadata is not None:
+            schema_metadata = dict(table.schema.metadata or {})
+            schema_metadata[METADATA_KEY] = json.dumps(metadata).encode('utf-8')
+            table = table.replace_schema_metadata(schema_metadata)
+        _atomic_write(path, lambda tmp_path: pq.write_table(table, tmp_path))
+    except (pa.ArrowException, ValueError, TypeError) as e:
+        logging.warning("Could not cache frame as Parquet: %s", e)
+        return None
+    prune_cache(cache_dir, keep=path)
+    return path
+
+def read_frame(key, columns=None, cache_dir=CACHE_DIR):
+    if pa is None:
+        return None
+    path = cache_path(key, cache_dir)
+    if not os.path.exists(path):
+        return None
+    _touch(path)
+    return read_parquet(path, columns)
+
+def read_frame_metadata(key, cache_dir=CACHE_DIR):
+    # The metadata dict stored by write_frame, {} if none was stored, None if not cached
+    if pa is None:
+        return None
+    path = cache_path(key, cache_dir)
+    if not os.path.exists(path):
+        return None
+    raw = (pq.read_schema(path, memory_map=True).metadata or {}).get(METADATA_KEY)
+    return json.loads(raw) if raw else {}
+
+def read_parquet(path, columns=None):
+    # Memory-mapped and projected: only the requested columns are decoded
+    return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+def parquet_schema(path):
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    return parquet_file.schema_arrow.names, parquet_file.metadata.num_rows
+
+def iter_parquet(path, columns=None, batch_rows=BATCH_ROWS):
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+        yield batch.to_pandas()
+
+def sniff_dialect(sample):
+    # Returns (delimiter, quotechar) from the first complete lines of a byte sample
+    text = sample.decode('utf-8', errors='ignore')
+    if len(sample) >= SNIFF_BYTES and '\n' in text:
+        text = text[:text.rfind('\n')]
+    try:
+        dialect = csv.Sniffer().sniff(text, delimiters=',;\t|')
+        return dialect.delimiter, dialect.quotechar or '"'
+    except csv.Error:
+        return ',', '"'
+
+def read_csv_buffer(data):
+    # Parses an in-memory CSV (bytes or memoryview) with typed columns in one native pass.
+    # pyarrow reads the buffer without copying it; pandas' C engine is the fallback.
+    view = memoryview(data)
+    delimiter, quotechar = sniff_dialect(view[:SNIFF_BYTES].tobytes())
+    df = None
+    if pa is not None:
+        try:
+            parse_options = pa_csv.ParseOptions(delimiter=delimiter, quote_char=quotechar, newlines_in_values=True)
+            df = pa_csv.read_csv(pa.BufferReader(pa.py_buffer(view)), parse_options=parse_options).to_pandas()
+        except pa.ArrowInvalid as e:
+            logging.warning("pyarrow could not parse the CSV, falling back to pandas: %s", e)
+    if df is None:
+        df = pd.read_csv(io.BytesIO(view), sep=delimiter, quotechar=quotechar, engine='c', on_bad_lines='warn')
+    # Drop any completely empty columns
+    df.dropna(axis=1, how='all', inplace=True)
+    return df
+
+def coerce_numeric(df):
+    # Converts text columns that hold only numbers; returns (df, columns left as text)
+    failed = []
+    for col in df.select_dtypes(include=['object', 'string']).columns:
+        values = df[col]
+        converted = pd.to_numeric(values, errors='coerce')
+        if converted.isna().sum() == values.isna().sum():
+            df[col] = converted
+        else:
+            failed.append(col)
+    return df, failed
+
+def load_dataset(csv_path, columns=None):
+    parquet_path = ensure_parquet(csv_path)
+    if parquet_path is None:
+        return pd.read_csv(csv_path, usecols=columns)
+    return read_parquet(parquet_path, columns)
@@ -1,10 +1,24 @@
 import pandas as pd
+import plotly
 import plotly.express as px
 import json
+from scripts.columnar import ensure_parquet, iter_parquet, load_dataset, parquet_schema
+from scripts.jobs import JobCancelled
 
-def load_data(file_path):
+# Columns the sunburst chart is built from
+SUNBURST_PATH = ['Country of origin', 'Country of asylum']
+SUNBURST_VALUE = 'Recognized decisions'
+
+# Rows read per chunk when streaming a CSV, and rows sampled to infer dtypes
+CHUNK_SIZE = 100000
+SAMPLE_ROWS = 10000
+# Partial aggregates are merged after this many chunks to keep memory bounded
+COMPACT_EVERY = 10
+
+def load_data(file_path, columns=None):
     try:
-        df = pd.read_csv(file_path)
+        # Parsed from CSV once, then read back from the Parquet cache with column projection
+        df = load_dataset(file_path, columns)
         if df.empty:
             raise ValueError("Dataframe is empty")
         return df
@@ -15,6 +29,83 @@ def load_data(file_path):
         print(f"Error loading data: {e}")
         return None
 
+def infer_dtypes(file_path, sample_rows=SAMPLE_ROWS):
+    # Returns the header and a dtype map from the first rows: text columns are read as str,
+    # numeric columns are coerced chunk by chunk (a stray value later on becomes NaN, not an error)
+    sample = pd.read_csv(file_path, nrows=sample_rows)
+    dtypes = {}
+    for col, dtype in sample.dtypes.items():
+        dtypes[col] = 'float64' if pd.api.types.is_numeric_dtype(dtype) else str
+    return sample.columns.tolist(), dtypes
+
+def iter_chunks(file_path, usecols=None, dtypes=None, chunksize=CHUNK_SIZE):
+    text_dtypes = None
+    if dtypes:
+        text_dtypes = {col: dtype for col, dtype in dtypes.items() if dtype is str and (usecols is None or col in usecols)}
+    for chunk in pd.read_csv(file_path, usecols=usecols, dtype=text_dtypes, chunksize=chunksize):
+        if dtypes:
+            for col in chunk.columns:
+                if dtypes.get(col) == 'float64':
+                    chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+        yield chunk
+
+def merge_sunburst_partials(partials):
+    return pd.concat(partials).groupby(level=list(range(len(SUNBURST_PATH))), sort=False).sum()
+
+def analyze_csv(file_path, chunksize=CHUNK_SIZE, cancel=None):
+    # Streams the file once: counts rows and, when the sunburst columns exist, sums
+    # Recognized decisions per path. Returns (data_info, sunburst_df) or (None, None).
+    # A background job passes its CancelToken as cancel; it is checked between chunks.
+    try:
+        # With pyarrow the CSV is converted to Parquet once; the row count then comes from
+        # its metadata and only the sunburst columns are decoded
+        parquet_path = ensure_parquet(file_path)
+        if parquet_path is not None:
+            columns, parquet_rows = parquet_schema(parquet_path)
+        else:
+            columns, dtypes = infer_dtypes(file_path)
+        has_sunburst = all(col in columns for col in SUNBURST_PATH + [SUNBURST_VALUE])
+        usecols = SUNBURST_PATH + [SUNBURST_VALUE] if has_sunburst else columns[:1]
+
+        if parquet_path is not None:
+            chunks = iter_parquet(parquet_path, usecols, chunksize) if has_sunburst else []
+        else:
+            if has_sunburst:
+                dtypes[SUNBURST_VALUE] = 'float64'
+            chunks = iter_chunks(file_path, usecols=usecols, dtypes=dtypes, chunksize=chunksize)
+
+        num_rows = 0
+        partials = []
+        for chunk in chunks:
+            if cancel is not None:
+                cancel.check()
+            num_rows += len(chunk)
+            if has_sunburst:
+                chunk[SUNBURST_VALUE] = pd.to_numeric(chunk[SUNBURST_VALUE], errors='coerce')
+                partials.append(chunk.groupby(SUNBURST_PATH, sort=False)[SUNBURST_VALUE].sum())
+                if len(partials) >= COMPACT_EVERY:
+                    partials = [merge_sunburst_partials(partials)]
+
+        if parquet_path is not None:
+            num_rows = parquet_rows
+        if num_rows == 0:
+            raise ValueError("Dataframe is empty")
+        data_info = {
+            'columns': columns,
+            'num_rows': num_rows,
+            'num_columns': len(columns)
+        }
+        sunburst_df = merge_sunburst_partials(partials).reset_index() if partials else None
+        return data_info, sunburst_df
+    except JobCancelled:
+        raise
+    except pd.errors.ParserError as e:
+        print(f"Error tokenizing data: {e}")
+        return None, None
+    except Exception as e:
+        print(f"Error loading data: {e}")
+        return None, None
+
 def analyze_data(df):
     data_info = {
         'columns': df.columns.tolist(),
@@ -23,11 +114,32 @@ def analyze_data(df):
     }
     return data_info
 
-def create_sunburst_chart(df):
+def aggregate_sunburst(df, top_n=None, other_label='Other'):
+    # One row per origin/asylum path with summed decisions, so the figure scales with the
+    # number of distinct paths instead of the row count. With top_n, only the top_n origins
+    # (and the top_n asylum countries within each) are kept; the rest are summed into other_label.
+    origin, asylum = SUNBURST_PATH
+    grouped = df[SUNBURST_PATH].astype(object)
+    grouped[SUNBURST_VALUE] = pd.to_numeric(df[SUNBURST_VALUE], errors='coerce')
+    grouped = grouped.groupby(SUNBURST_PATH, sort=False)[SUNBURST_VALUE].sum().reset_index()
+    if not top_n:
+        return grouped
+
+    origin_totals = grouped.groupby(origin, sort=False)[SUNBURST_VALUE].sum()
+    keep = origin_totals.nlargest(top_n).index
+    grouped[origin] = grouped[origin].where(grouped[origin].isin(keep), other_label)
+    grouped = grouped.groupby(SUNBURST_PATH, sort=False)[SUNBURST_VALUE].sum().reset_index()
+
+    rank = grouped.groupby(origin, sort=False)[SUNBURST_VALUE].rank(method='first', ascending=False)
+    grouped[asylum] = grouped[asylum].where(rank <= top_n, other_label)
+    return grouped.groupby(SUNBURST_PATH, sort=False)[SUNBURST_VALUE].sum().reset_index()
+
+def create_sunburst_chart(df, top_n=None):
     if 'Country of origin' not in df.columns or 'Country of asylum' not in df.columns or 'Recognized decisions' not in df.columns:
         raise ValueError("Required columns are missing in the dataframe")
 
-    fig = px.sunburst(df, path=['Country of origin', 'Country of asylum'], values='Recognized decisions',
+    aggregated = aggregate_sunburst(df, top_n)
+    fig = px.sunburst(aggregated, path=['Country of origin', 'Country of asylum'], values='Recognized decisions',
                       title="Recognized Asylum Decisions by Country of Origin and Country of Asylum")
     graph_json = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
     return graph_json
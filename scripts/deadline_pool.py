@@ -0,0 +1,52 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+
+DEFAULT_MAX_WORKERS = 8
+
+def run_in_daemon_thread(fn, args, slots):
+    # Daemon threads can be abandoned: a call still running at exit does not keep the
+    # interpreter alive, unlike ThreadPoolExecutor workers, which are joined at exit
+    future = Future()
+
+    def run():
+        with slots:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+    threading.Thread(target=run, name='deadline-pool', daemon=True).start()
+    return future
+
+def gather(calls, max_workers=DEFAULT_MAX_WORKERS):
+    # calls is a list of (name, fn, args, deadline) with deadlines on the time.monotonic()
+    # clock. Returns {index: result} for the calls that finished in time; late calls are
+    # logged and left running in the background, failed ones are logged and dropped.
+    slots = threading.BoundedSemaphore(max(max_workers, 1))
+    pending = {}
+    for index, (name, fn, args, deadline) in enumerate(calls):
+        pending[run_in_daemon_thread(fn, args, slots)] = (index, name, deadline)
+
+    collected = {}
+    while pending:
+        now = time.monotonic()
+        for future, (index, name, deadline) in list(pending.items()):
+            if deadline <= now and not future.done():
+                logging.warning(f"Timed out waiting for {name}, returning partial results")
+                future.cancel()
+                del pending[future]
+        if not pending:
+            break
+
+        next_deadline = min(deadline for _, _, deadline in pending.values())
+        done, _ = wait(pending, timeout=max(next_deadline - now, 0), return_when=FIRST_COMPLETED)
+        for future in done:
+            index, name, _ = pending.pop(future)
+            try:
+                collected[index] = future.result()
+            except Exception as e:
+                logging.error(f"Failed to fetch data from {name}: {e}")
+    return collected
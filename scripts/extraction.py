@@ -0,0 +1,306 @@
+import codecs
+import json
+import re
+import threading
+from html.parser import HTMLParser
+
+# Elements that never have an end tag
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+])
+# Start tags that implicitly close an open <p>
+CLOSES_P = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'div', 'dl', 'fieldset', 'footer',
+    'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'main', 'nav',
+    'ol', 'p', 'pre', 'section', 'table', 'ul'
+])
+# Text inside these is never part of an extracted value
+SKIP_TEXT = frozenset(['script', 'style', 'template'])
+
+# Field maps used when config.json does not declare its own
+PAGE_FIELDS = {
+    'title': 'title',
+    'meta_description': 'meta[name=description]::attr(content)',
+    'headings': {'selector': 'h1, h2, h3, h4, h5, h6', 'many': True},
+    'paragraphs': {'selector': 'p', 'many': True}
+}
+WIKIPEDIA_FIELDS = {
+    'heading': {'selector': 'h1, h2, h3', 'many': True},
+    'paragraph': {'selector': 'p', 'many': True}
+}
+
+COMPOUND_RE = re.compile(r'([a-zA-Z][\w-]*|\*)?((?:[.#][\w-]+|\[[^\]]+\])*)$')
+PART_RE = re.compile(r'([.#])([\w-]+)|\[\s*([\w-]+)\s*(?:=\s*["\']?([^"\'\]]*)["\']?\s*)?\]')
+ATTR_SUFFIX_RE = re.compile(r'::attr\(\s*([\w-]+)\s*\)$')
+
+class Compound:
+    __slots__ = ('tag', 'classes', 'id', 'attrs')
+
+    def __init__(self, tag, classes, id_, attrs):
+        self.tag = tag
+        self.classes = classes
+        self.id = id_
+        self.attrs = attrs
+
+    def matches(self, tag, attrs, classes):
+        if self.tag is not None and self.tag != tag:
+            return False
+        if self.id is not None and attrs.get('id') != self.id:
+            return False
+        if self.classes and not self.classes <= classes:
+            return False
+        for name, value in self.attrs:
+            if name not in attrs or (value is not None and attrs[name] != value):
+                return False
+        return True
+
+class Selector:
+    """A compiled descendant selector such as ``div#content p.lead``."""
+    __slots__ = ('compounds', 'tag')
+
+    def __init__(self, compounds):
+        self.compounds = compounds
+        self.tag = compounds[-1].tag
+
+    def matches(self, stack):
+        # stack holds (tag, attrs, classes) for every open element, innermost last
+        if not self.compounds[-1].matches(*stack[-1]):
+            return False
+        position = len(stack) - 2
+        for compound in reversed(self.compounds[:-1]):
+            while position >= 0 and not compound.matches(*stack[position]):
+                position -= 1
+            if position < 0:
+                return False
+            position -= 1
+        return True
+
+class FieldSpec:
+    __slots__ = ('name', 'selectors', 'attr', 'many')
+
+    def __init__(self, name, selectors, attr=None, many=False):
+        self.name = name
+        self.selectors = selectors
+        self.attr = attr
+        self.many = many
+
+def compile_compound(text):
+    match = COMPOUND_RE.match(text)
+    if not match:
+        raise ValueError(f"Unsupported selector: {text!r}")
+    tag = match.group(1)
+    classes = set()
+    id_ = None
+    attrs = []
+    for kind, name, attr_name, attr_value in PART_RE.findall(match.group(2)):
+        if kind == '.':
+            classes.add(name)
+        elif kind == '#':
+            id_ = name
+        else:
+            attrs.append((attr_name.lower(), attr_value if attr_value != '' else None))
+    return Compound(None if tag in (None, '*') else tag.lower(), frozenset(classes), id_, tuple(attrs))
+
+def compile_selector(text):
+    # Supports tag, .class, #id, [attr] and [attr=value] joined by descendant whitespace,
+    # comma-separated groups, and a trailing ::attr(name) to extract an attribute
+    text = text.strip()
+    attr = None
+    suffix = ATTR_SUFFIX_RE.search(text)
+    if suffix:
+        attr = suffix.group(1).lower()
+        text = text[:suffix.start()]
+    selectors = []
+    for group in text.split(','):
+        parts = group.split()
+        if not parts:
+            raise ValueError(f"Empty selector in {text!r}")
+        selectors.append(Selector([compile_compound(part) for part in parts]))
+    return selectors, attr
+
+_schema_cache = {}
+_schema_lock = threading.Lock()
+
+def compile_fields(field_config):
+    fields = []
+    for name, spec in field_config.items():
+        if isinstance(spec, str):
+            spec = {'selector': spec}
+        selectors, attr = compile_selector(spec['selector'])
+        fields.append(FieldSpec(name, selectors, attr or spec.get('attr'), spec.get('many', False)))
+    return fields
+
+def compile_schema(field_config):
+    # Compile each distinct schema once per process; later calls reuse the compiled fields
+    key = json.dumps(field_config, sort_keys=True)
+    fields = _schema_cache.get(key)
+    if fields is None:
+        with _schema_lock:
+            fields = _schema_cache.get(key)
+            if fields is None:
+                fields = compile_fields(field_config)
+                _schema_cache[key] = fields
+    return fields
+
+class StreamingExtractor(HTMLParser):
+    """Single-pass, SAX-style extractor.
+
+    Feed it HTML (all at once or in chunks); every configured field is matched as tags
+    open, so no tree is built and the results come out in document order.
+    """
+
+    def __init__(self, fields):
+        super().__init__(convert_charrefs=True)
+        self.fields = fields
+        self.by_tag = {}
+        self.any_tag = []
+        for field in fields:
+            for selector in field.selectors:
+                if selector.tag is None:
+                    self.any_tag.append((field, selector))
+                else:
+                    self.by_tag.setdefault(selector.tag, []).append((field, selector))
+        self.stack = []
+        self.frames = []      # open text captures: [depth, event index, parts]
+        self.events = []      # [field name, value] in document order
+        self.found = set()
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in CLOSES_P and self.stack and self.stack[-1][0] == 'p':
+            self._pop_to(len(self.stack) - 1)
+        elif tag == 'li' and self.stack and self.stack[-1][0] == 'li':
+            self._pop_to(len(self.stack) - 1)
+
+        attr_map = {name: value if value is not None else '' for name, value in attrs}
+        classes = frozenset(attr_map.get('class', '').split())
+        void = tag in VOID_ELEMENTS
+        self.stack.append((tag, attr_map, classes))
+
+        candidates = self.by_tag.get(tag, ())
+        if self.any_tag:
+            candidates = list(candidates) + self.any_tag
+        matched = set()
+        for field, selector in candidates:
+            if field.name in matched or (not field.many and field.name in self.found):
+                continue
+            if not selector.matches(self.stack):
+                continue
+            matched.add(field.name)
+            if field.attr is not None:
+                if field.attr in attr_map:
+                    self.events.append([field.name, attr_map[field.attr]])
+                    self.found.add(field.name)
+            elif not void:
+                self.frames.append([len(self.stack), len(self.events), []])
+                self.events.append([field.name, None])
+                self.found.add(field.name)
+
+        if tag in SKIP_TEXT:
+            self.skip_depth += 1
+        if void:
+            self.stack.pop()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth][0] == tag:
+                self._pop_to(depth)
+                return
+
+    def handle_data(self, data):
+        if self.frames and not self.skip_depth:
+            for frame in self.frames:
+                frame[2].append(data)
+
+    def _pop_to(self, depth):
+        # Close every element at or above depth, finishing their text captures
+        while len(self.stack) > depth:
+            tag = self.stack.pop()[0]
+            if tag in SKIP_TEXT:
+                self.skip_depth -= 1
+            while self.frames and self.frames[-1][0] > len(self.stack):
+                _, index, parts = self.frames.pop()
+                self.events[index][1] = ''.join(parts)
+
+    def close(self):
+        super().close()
+        self._pop_to(0)
+        return self.events
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="text/html; charset=...">
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+# Bytes searched for a declared encoding, as in the HTML prescan
+PRESCAN_BYTES = 1024
+
+def _codec(name, default='utf-8'):
+    try:
+        return codecs.lookup(name).name if name else default
+    except LookupError:
+        return default
+
+def sniff_charset(head, default='utf-8'):
+    # Encoding the document declares itself: a byte order mark, else a meta tag
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    match = META_CHARSET_RE.search(head[:PRESCAN_BYTES])
+    return _codec(match.group(1).decode('ascii') if match else None, default)
+
+def decode_chunks(chunks, encoding=None):
+    # Decodes a byte stream incrementally. Without an encoding (the Content-Type header
+    # named no charset) it is sniffed from the start of the document.
+    decoder = None
+    head = b''
+    for chunk in chunks:
+        if decoder is None:
+            head += chunk
+            if not encoding and len(head) < PRESCAN_BYTES:
+                continue
+            decoder = codecs.getincrementaldecoder(_codec(encoding) if encoding else sniff_charset(head))('replace')
+            chunk, head = head, b''
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    if decoder is None:
+        decoder = codecs.getincrementaldecoder(_codec(encoding) if encoding else sniff_charset(head))('replace')
+    text = decoder.decode(head, final=True)
+    if text:
+        yield text
+
+def extract_events(html, fields):
+    extractor = StreamingExtractor(fields)
+    extractor.feed(html)
+    return extractor.close()
+
+def extract_stream(chunks, fields):
+    extractor = StreamingExtractor(fields)
+    for chunk in chunks:
+        extractor.feed(chunk)
+    return extractor.close()
+
+def collect_fields(events, fields):
+    # Group events by field: lists for "many" fields, first value (or None) otherwise
+    data = {field.name: [] if field.many else None for field in fields}
+    many = {field.name for field in fields if field.many}
+    for name, value in events:
+        if name in many:
+            data[name].append(value)
+        elif data[name] is None:
+            data[name] = value
+    return data
+
+def extract_fields(html, fields):
+    return collect_fields(extract_events(html, fields), fields)
+
+def missing_fields(data):
+    return [name for name, value in data.items() if value is None or value == []]
+
+def extract_blocks(html, fields):
+    return [{'type': name, 'text': value} for name, value in extract_events(html, fields)]
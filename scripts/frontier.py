@@ -0,0 +1,116 @@
+import sqlite3
+import threading
+import time
+from urllib.parse import urldefrag
+
+PENDING = 'pending'
+IN_FLIGHT = 'in_flight'
+DONE = 'done'
+FAILED = 'failed'
+
+class Frontier:
+    """Durable, deduplicated URL frontier backed by SQLite.
+
+    Every URL is stored once with its status, crawl depth and retry count. URLs left
+    in flight by a crash go back to pending when the frontier is reopened, so a restarted
+    crawl continues from the checkpoint. Pending URLs are handed out breadth-first.
+    """
+
+    def __init__(self, path, max_retries=3):
+        self.path = path
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                depth INTEGER NOT NULL DEFAULT 0,
+                retries INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS frontier_status_idx ON frontier (status, depth)")
+        self.recovered = self.recover()
+
+    @staticmethod
+    def normalize(url):
+        return urldefrag(url.strip())[0]
+
+    def add(self, urls, depth=0):
+        # Returns how many URLs were new; already-known URLs are ignored whatever their status
+        now = time.time()
+        rows = [(self.normalize(url), PENDING, depth, now) for url in urls]
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, status, depth, updated_at) VALUES (?, ?, ?, ?)", rows)
+            self.conn.execute("COMMIT")
+            return self.conn.total_changes - before
+
+    def recover(self):
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE frontier SET status = ?, updated_at = ? WHERE status = ?", (PENDING, time.time(), IN_FLIGHT))
+            return cursor.rowcount
+
+    def claim(self, limit=1):
+        # Marks up to limit pending URLs in flight (shallowest first) and returns [(url, depth)]
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            rows = self.conn.execute(
+                "SELECT url, depth FROM frontier WHERE status = ? ORDER BY depth, rowid LIMIT ?",
+                (PENDING, limit)).fetchall()
+            self.conn.executemany(
+                "UPDATE frontier SET status = ?, updated_at = ? WHERE url = ?",
+                [(IN_FLIGHT, time.time(), url) for url, _ in rows])
+            self.conn.execute("COMMIT")
+            return rows
+
+    def mark_done(self, url):
+        with self._lock:
+            self.conn.execute(
+                "UPDATE frontier SET status = ?, error = NULL, updated_at = ? WHERE url = ?",
+                (DONE, time.time(), self.normalize(url)))
+
+    def mark_failed(self, url, error):
+        # Failed URLs go back to pending until they have used up max_retries; returns the new status
+        url = self.normalize(url)
+        with self._lock:
+            self.conn.execute("""
+                UPDATE frontier
+                SET retries = retries + 1,
+                    status = CASE WHEN retries + 1 >= ? THEN ? ELSE ? END,
+                    error = ?, updated_at = ?
+                WHERE url = ?
+            """, (self.max_retries, FAILED, PENDING, str(error), time.time(), url))
+            row = self.conn.execute("SELECT status FROM frontier WHERE url = ?", (url,)).fetchone()
+            return row[0] if row else None
+
+    def counts(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status").fetchall()
+        counts = {PENDING: 0, IN_FLIGHT: 0, DONE: 0, FAILED: 0}
+        counts.update(rows)
+        return counts
+
+    def has_pending(self):
+        return self.counts()[PENDING] > 0
+
+    def is_finished(self):
+        counts = self.counts()
+        return counts[PENDING] == 0 and counts[IN_FLIGHT] == 0 and (counts[DONE] + counts[FAILED]) > 0
+
+    def restart(self):
+        # Start a new pass over every known URL, e.g. for the next scheduled run
+        with self._lock:
+            self.conn.execute(
+                "UPDATE frontier SET status = ?, retries = 0, error = NULL, updated_at = ?", (PENDING, time.time()))
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
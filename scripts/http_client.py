@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from scripts import metrics
+from scripts.rate_limit import THROTTLE_STATUSES, rate_limiter
+
+# urllib3 only decodes brotli bodies when one of these packages is importable
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.json'))
+
+# Defaults for the shared session; override with the "http" section of config/config.json
+DEFAULT_SETTINGS = {
+    'timeout': 10,
+    'retries': 3,
+    'backoff_factor': 0.5,
+    # 429/503 are left to the rate limiter so it can slow the host down
+    'status_forcelist': [500, 502, 504],
+    'throttle_retries': 3,
+    'pool_connections': 20,
+    'pool_maxsize': 20,
+    'user_agent': 'HRVST-Scraper/1.0',
+    'rate_limit': {}
+}
+
+_lock = threading.Lock()
+_session = None
+_settings = None
+
+def load_http_settings(config_path=CONFIG_PATH):
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        with open(config_path, 'r') as f:
+            settings.update(json.load(f).get('http', {}))
+    except (OSError, ValueError) as e:
+        logging.debug("Using default HTTP settings: %s", e)
+    return settings
+
+def build_session(settings):
+    # 429/503 must reach get() so the rate limiter sees them: urllib3 would otherwise retry
+    # them itself (sleeping for Retry-After) whether or not they are in status_forcelist
+    retry = Retry(
+        total=settings['retries'],
+        backoff_factor=settings['backoff_factor'],
+        status_forcelist=[status for status in settings['status_forcelist'] if status not in THROTTLE_STATUSES],
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    # One urllib3 pool per host (up to pool_connections hosts), each keeping pool_maxsize
+    # keep-alive connections, so repeated requests to a host skip the TCP+TLS handshake
+    adapter = HTTPAdapter(pool_connections=settings['pool_connections'],
+                          pool_maxsize=settings['pool_maxsize'],
+                          max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'User-Agent': settings['user_agent'],
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive'
+    })
+    return session
+
+def configure(**overrides):
+    global _session, _settings
+    with _lock:
+        settings = load_http_settings()
+        settings.update(overrides)
+        if _session is not None:
+            _session.close()
+        _settings = settings
+        _session = build_session(settings)
+        rate_limiter.configure(**settings['rate_limit'])
+    return _session
+
+def get_session():
+    global _session, _settings
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _settings = load_http_settings()
+                rate_limiter.configure(**_settings['rate_limit'])
+                _session = build_session(_settings)
+    return _session
+
+def get(url, **kwargs):
+    # Every request waits for its host's token; 429/503 slow the host down and are retried
+    session = get_session()
+    kwargs.setdefault('timeout', _settings['timeout'])
+    attempts = _settings['throttle_retries'] + 1
+    for attempt in range(attempts):
+        waited = rate_limiter.acquire(url)
+        if waited:
+            metrics.observe('rate_limit_wait', waited)
+        started = time.perf_counter()
+        response = session.get(url, **kwargs)
+        # With stream=True this covers the headers only; the body is timed by the caller's parse
+        metrics.observe('http_request', time.perf_counter() - started)
+        metrics.increment('http_responses', status=response.status_code)
+        rate_limiter.record(url, response.status_code, response.headers.get('Retry-After'))
+        if response.status_code not in THROTTLE_STATUSES or attempt == attempts - 1:
+            return response
+        logging.warning("Throttled by %s (HTTP %s), retrying", rate_limiter.host(url), response.status_code)
+        response.close()
+    return response
+
+def response_charset(response):
+    # The charset named in Content-Type, or None. Unlike response.encoding this does not
+    # fall back to ISO-8859-1 for text/* responses, so the caller can sniff the document.
+    for param in response.headers.get('Content-Type', '').split(';')[1:]:
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'charset':
+            return value.strip().strip('"\'') or None
+    return None
+
+def rate_limit_stats():
+    return rate_limiter.stats()
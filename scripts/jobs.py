@@ -0,0 +1,173 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+class QueueFull(Exception):
+    pass
+
+class JobCancelled(Exception):
+    pass
+
+class CancelToken:
+    """Picklable cancellation flag shared with a worker process through a marker file.
+
+    Workers call check() between units of work (e.g. CSV chunks); it raises JobCancelled
+    once the marker exists.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def cancelled(self):
+        return os.path.exists(self.path)
+
+    def check(self):
+        if self.cancelled():
+            raise JobCancelled()
+
+class Job:
+    __slots__ = ('id', 'future', 'token', 'created', 'finished', 'status', 'result', 'error')
+
+    def __init__(self, job_id, token):
+        self.id = job_id
+        self.future = None
+        self.token = token
+        self.created = time.time()
+        self.finished = None
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+
+    def to_dict(self):
+        return {'id': self.id, 'status': self.status, 'error': self.error,
+                'created': self.created, 'finished': self.finished}
+
+class JobQueue:
+    """Runs functions in a process pool and tracks them by job id.
+
+    At most max_pending jobs may be queued or running; submit() raises QueueFull beyond
+    that so a burst of uploads cannot pile up unbounded work. Each function is called with
+    a CancelToken as its last argument. Finished jobs are kept (oldest dropped first) so
+    clients can collect their results.
+    """
+
+    def __init__(self, max_workers=2, max_pending=8, job_dir='jobs', keep_finished=256):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.job_dir = job_dir
+        self.keep_finished = keep_finished
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Created on first use, e.g. not in the reloader's parent process. By then the web
+        # server is running threads, and forking a threaded process can copy a lock some
+        # other thread holds, so workers are spawned fresh instead.
+        if self._executor is None:
+            os.makedirs(self.job_dir, exist_ok=True)
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def submit(self, fn, *args, on_success=None, on_finish=None):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFull(f"{self._pending} jobs are already waiting")
+            job_id = uuid.uuid4().hex
+            job = Job(job_id, CancelToken(os.path.join(self.job_dir, f"{job_id}.cancel")))
+            try:
+                job.future = self._get_executor().submit(fn, *args, job.token)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); the pool is unusable, so start a new one
+                logging.warning("Process pool is broken, starting a new one")
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                job.future = self._get_executor().submit(fn, *args, job.token)
+            # Only registered once the pool has accepted it
+            self._jobs[job_id] = job
+            self._pending += 1
+        job.future.add_done_callback(lambda future: self._finish(job, future, on_success, on_finish))
+        return job_id
+
+    def _finish(self, job, future, on_success, on_finish=None):
+        status, result, error = DONE, None, None
+        try:
+            result = future.result()
+        except (CancelledError, JobCancelled):
+            status = CANCELLED
+        except Exception as e:
+            logging.error("Job %s failed: %s", job.id, e)
+            status, error = FAILED, str(e)
+        with self._lock:
+            # A cancel that arrived after the worker's last check still wins; cancel() takes
+            # this lock too, so it either lands before this point or sees the job finished
+            if status == DONE and job.token.cancelled():
+                status, result = CANCELLED, None
+            job.status, job.result, job.error = status, result, error
+            job.finished = time.time()
+            self._pending -= 1
+            self._prune()
+        if status == DONE and on_success is not None:
+            try:
+                on_success(result)
+            except Exception as e:
+                logging.error("Job %s result handler failed: %s", job.id, e)
+        if os.path.exists(job.token.path):
+            os.remove(job.token.path)
+        # Called whatever the outcome, e.g. to release files the job was reading
+        if on_finish is not None:
+            try:
+                on_finish(job)
+            except Exception as e:
+                logging.error("Job %s finish handler failed: %s", job.id, e)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished is not None]
+        for job_id in finished[:max(len(finished) - self.keep_finished, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status == QUEUED and job.future.running():
+                job.status = RUNNING
+            return job
+
+    def cancel(self, job_id):
+        # Running jobs stop at their next check(). The marker is written under the lock
+        # _finish stores results with, so a cancel is never lost to a job finishing.
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished is not None:
+                return job
+            with open(job.token.path, 'w'):
+                pass
+        # Queued jobs are dropped; outside the lock, as this runs the done callback
+        job.future.cancel()
+        return job
+
+    def stats(self):
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+            for job in self._jobs.values():
+                running = job.status == QUEUED and job.future.running()
+                counts[RUNNING if running else job.status] += 1
+            return {'pending': self._pending, 'max_pending': self.max_pending, 'jobs': counts}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
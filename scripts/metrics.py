@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIX = 'hrvst_'
+# Histogram buckets in seconds, from a cached page parse up to a large upload
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _labels_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in items) + '}'
+
+class Registry:
+    """In-process counters, gauges and timers.
+
+    Timers are histograms of seconds (exported as <prefix><name>_seconds), counters are
+    exported as <prefix><name>_total and gauges as <prefix><name>. All take free-form labels, e.g.
+    timer('stage', stage='fetch', component='wikiscrap').
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self._counters = {}   # (name, labels) -> value
+            self._gauges = {}     # (name, labels) -> value
+            self._timers = {}     # (name, labels) -> [count, total, max, bucket counts]
+
+    def increment(self, name, value=1, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, _labels_key(labels))] = value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is None:
+                timer = self._timers[key] = [0, 0.0, 0.0, [0] * len(self.buckets)]
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    timer[3][i] += 1
+                    break
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def render(self):
+        # Prometheus text exposition format (version 0.0.4)
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            timers = sorted((key, [count, total, peak, list(buckets)]) for key, (count, total, peak, buckets) in self._timers.items())
+        lines = []
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f"{PREFIX}{name}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+        for (name, labels), value in gauges:
+            metric = f"{PREFIX}{name}"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+        for (name, labels), (count, total, _, buckets) in timers:
+            metric = f"{PREFIX}{name}_seconds"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, buckets):
+                cumulative += bucket
+                lines.append(f"{metric}_bucket{_format_labels(labels, ('le', repr(bound)))} {cumulative}")
+            lines.append(f"{metric}_bucket{_format_labels(labels, ('le', '+Inf'))} {count}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        # Machine-readable snapshot for per-run reports
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            gauges = [{'name': name, 'labels': dict(labels), 'value': value}
+                      for (name, labels), value in sorted(self._gauges.items())]
+            timers = [{'name': name, 'labels': dict(labels), 'count': count,
+                       'total_seconds': round(total, 6), 'mean_seconds': round(total / count, 6) if count else None,
+                       'max_seconds': round(peak, 6)}
+                      for (name, labels), (count, total, peak, _) in sorted(self._timers.items())]
+            started = self.started
+        return {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started)),
+            'elapsed_seconds': round(time.time() - started, 3),
+            'counters': counters,
+            'gauges': gauges,
+            'timers': timers
+        }
+
+    def write_summary(self, path, **extra):
+        report = self.summary()
+        report.update(extra)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+        return report
+
+# Process-wide registry shared by the scrapers, the webapp and the dashboard
+registry = Registry()
+increment = registry.increment
+set_gauge = registry.set_gauge
+observe = registry.observe
+timer = registry.timer
+render = registry.render
+summary = registry.summary
+write_summary = registry.write_summary
+
+def stage(name, component):
+    # Shorthand for the pipeline stages: fetch, parse, extract, persist, render
+    return registry.timer('stage', stage=name, component=component)
@@ -0,0 +1,166 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = frozenset([429, 503])
+
+# Defaults; override with "http" -> "rate_limit" in config/config.json
+DEFAULT_RATE = 2.0          # requests per second per host
+DEFAULT_BURST = 4           # bucket capacity
+DEFAULT_MIN_RATE = 0.05     # never slow a host below this
+DEFAULT_DECREASE = 0.5      # multiply the rate by this on 429/503
+DEFAULT_RECOVERY = 0.05     # add this fraction of the base rate per successful response
+DEFAULT_BACKOFF = 5.0       # seconds to pause a host on 429/503 without Retry-After
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+class HostBucket:
+    __slots__ = ('base_rate', 'rate', 'capacity', 'tokens', 'updated', 'blocked_until',
+                 'waiting', 'requests', 'throttled')
+
+    def __init__(self, rate, capacity):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiting = 0
+        self.requests = 0
+        self.throttled = 0
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+class RateLimiter:
+    """Per-host token buckets shared by every fetcher in the process.
+
+    acquire() blocks until the host has a token. record() adapts the host's rate:
+    429/503 halves it and pauses the host for Retry-After (or a default backoff),
+    and each successful response lets the rate creep back up to its configured value.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, min_rate=DEFAULT_MIN_RATE,
+                 decrease=DEFAULT_DECREASE, recovery=DEFAULT_RECOVERY, backoff=DEFAULT_BACKOFF, host_rates=None):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        # Ceilings set from outside the config (robots.txt Crawl-delay); configure() keeps them
+        self._caps = {}
+        self.configure(rate, burst, min_rate, decrease, recovery, backoff, host_rates)
+
+    def configure(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, min_rate=DEFAULT_MIN_RATE,
+                  decrease=DEFAULT_DECREASE, recovery=DEFAULT_RECOVERY, backoff=DEFAULT_BACKOFF, host_rates=None):
+        with self._lock:
+            self.rate = rate
+            self.burst = burst
+            self.min_rate = min_rate
+            self.decrease = decrease
+            self.recovery = recovery
+            self.backoff = backoff
+            self.host_rates = dict(host_rates or {})
+            self._buckets.clear()
+
+    @staticmethod
+    def host(url):
+        return urlparse(url).netloc or url
+
+    def _base_rate(self, host):
+        rate = self.host_rates.get(host, self.rate)
+        cap = self._caps.get(host)
+        return rate if cap is None else min(rate, cap)
+
+    def _bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = HostBucket(self._base_rate(host), self.burst)
+        return bucket
+
+    def acquire(self, url):
+        # Returns the seconds spent waiting for the token
+        host = self.host(url)
+        waited = 0.0
+        queued = False
+        with self._lock:
+            bucket = self._bucket(host)
+            while True:
+                now = time.monotonic()
+                bucket.refill(now)
+                if now >= bucket.blocked_until and bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    bucket.requests += 1
+                    if queued:
+                        bucket.waiting -= 1
+                    return waited
+                if not queued:
+                    bucket.waiting += 1
+                    queued = True
+                pause = max(bucket.blocked_until - now, (1 - bucket.tokens) / bucket.rate)
+                self._lock.release()
+                try:
+                    time.sleep(pause)
+                    waited += pause
+                finally:
+                    self._lock.acquire()
+
+    def record(self, url, status_code, retry_after=None):
+        host = self.host(url)
+        with self._lock:
+            bucket = self._bucket(host)
+            if status_code in THROTTLE_STATUSES:
+                bucket.throttled += 1
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                bucket.tokens = 0
+                pause = parse_retry_after(retry_after)
+                if pause is None:
+                    pause = self.backoff
+                bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + pause)
+            elif status_code < 400 and bucket.rate < bucket.base_rate:
+                bucket.rate = min(bucket.base_rate, bucket.rate + bucket.base_rate * self.recovery)
+
+    def cap_rate(self, url, rate):
+        # Set (or with None clear) a host's ceiling, e.g. to honor robots.txt Crawl-delay
+        host = self.host(url)
+        with self._lock:
+            if rate is None:
+                self._caps.pop(host, None)
+            else:
+                self._caps[host] = rate
+            bucket = self._bucket(host)
+            bucket.base_rate = self._base_rate(host)
+            bucket.rate = min(bucket.rate, bucket.base_rate)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {
+                    'rate': round(bucket.rate, 3),
+                    'base_rate': bucket.base_rate,
+                    'tokens': round(min(bucket.capacity, bucket.tokens + (now - bucket.updated) * bucket.rate), 3),
+                    'queue_depth': bucket.waiting,
+                    'backoff_remaining': round(max(bucket.blocked_until - now, 0.0), 3),
+                    'requests': bucket.requests,
+                    'throttled': bucket.throttled
+                }
+                for host, bucket in self._buckets.items()
+            }
+
+# Process-wide limiter used by scripts.http_client
+rate_limiter = RateLimiter()
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from scripts import http_client
+
+class ResponseCache:
+    """On-disk conditional-GET cache keyed by URL.
+
+    Stores each URL's ETag / Last-Modified and a hash of the body. fetch() sends
+    If-None-Match / If-Modified-Since and reports whether the page changed; the new
+    validators are only persisted by commit(), once the caller has processed the page,
+    so a failed run is retried in full next time.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._pending = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def load(self, url):
+        try:
+            with open(self._path(url), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, url):
+        entry = self.load(url) or {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def fetch(self, url, **kwargs):
+        # Returns (response, modified); raises for HTTP errors like http_client callers expect
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.conditional_headers(url))
+        response = http_client.get(url, headers=headers, **kwargs)
+        if response.status_code == 304:
+            return response, False
+        response.raise_for_status()
+
+        body_hash = hashlib.sha256(response.content).hexdigest()
+        entry = self.load(url)
+        # Servers without validators still let us skip identical bodies
+        if entry and entry.get('body_sha256') == body_hash:
+            return response, False
+
+        with self._lock:
+            self._pending[url] = {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'body_sha256': body_hash,
+                'stored_at': time.time()
+            }
+        return response, True
+
+    def commit(self, url):
+        with self._lock:
+            entry = self._pending.pop(url, None)
+        if entry is None:
+            return
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"Could not write response cache entry for {url}: {e}")
+
+    def discard(self, url):
+        with self._lock:
+            self._pending.pop(url, None)
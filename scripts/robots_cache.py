@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+import urllib.robotparser
+import requests
+from scripts import http_client
+from scripts.rate_limit import rate_limiter
+
+DEFAULT_TTL = 3600           # seconds a parsed robots.txt stays fresh
+DEFAULT_ERROR_TTL = 300      # retry unreachable robots.txt sooner
+DEFAULT_MAX_HOSTS = 512
+
+class RobotsCache:
+    """Per-host robots.txt cache with TTL, LRU eviction and Crawl-delay pacing.
+
+    Safe to share between threads: lookups take a short global lock and each host
+    is fetched at most once at a time, so concurrent workers wait for the same download.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_hosts=DEFAULT_MAX_HOSTS, user_agent='*', error_ttl=DEFAULT_ERROR_TTL):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_hosts = max_hosts
+        self.user_agent = user_agent
+        self._entries = OrderedDict()  # robots_url -> (parser, expires_at)
+        self._fetch_locks = {}
+        self._next_allowed = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def robots_url(url):
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
+
+    def _fetch(self, robots_url):
+        rp = urllib.robotparser.RobotFileParser()
+        rp.set_url(robots_url)
+        ttl = self.ttl
+        try:
+            response = http_client.get(robots_url)
+            # Same status handling as RobotFileParser.read()
+            if response.status_code in (401, 403):
+                rp.disallow_all = True
+            elif 400 <= response.status_code < 500:
+                rp.allow_all = True
+            elif response.status_code >= 500:
+                rp.disallow_all = True
+                ttl = self.error_ttl
+            else:
+                rp.parse(response.text.splitlines())
+                delay = rp.crawl_delay(self.user_agent)
+                # The cap follows the current robots.txt, so a removed Crawl-delay lifts it
+                rate_limiter.cap_rate(robots_url, 1.0 / float(delay) if delay else None)
+        except requests.exceptions.RequestException as e:
+            logging.warning("Could not fetch %s, treating host as disallowed: %s", robots_url, e)
+            rp.disallow_all = True
+            ttl = self.error_ttl
+        rp.modified()
+        return rp, time.monotonic() + ttl
+
+    def get_parser(self, url):
+        robots_url = self.robots_url(url)
+        with self._lock:
+            entry = self._entries.get(robots_url)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(robots_url)
+                self.hits += 1
+                return entry[0]
+            fetch_lock = self._fetch_locks.setdefault(robots_url, threading.Lock())
+
+        with fetch_lock:
+            # Another worker may have refreshed the entry while we waited
+            with self._lock:
+                entry = self._entries.get(robots_url)
+                if entry is not None and entry[1] > time.monotonic():
+                    self._entries.move_to_end(robots_url)
+                    self.hits += 1
+                    return entry[0]
+                self.misses += 1
+
+            rp, expires_at = self._fetch(robots_url)
+            with self._lock:
+                self._entries[robots_url] = (rp, expires_at)
+                self._entries.move_to_end(robots_url)
+                while len(self._entries) > self.max_hosts:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._fetch_locks.pop(evicted, None)
+                    self.evictions += 1
+            return rp
+
+    def can_fetch(self, url):
+        return self.get_parser(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        delay = self.get_parser(url).crawl_delay(self.user_agent)
+        return float(delay) if delay else 0.0
+
+    def wait(self, url):
+        # Block until the host's Crawl-delay allows another request; returns the time slept
+        delay = self.crawl_delay(url)
+        if not delay:
+            return 0.0
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(host, 0.0))
+            self._next_allowed[host] = slot + delay
+        pause = slot - now
+        if pause > 0:
+            time.sleep(pause)
+        return pause
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hosts': len(self._entries)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._next_allowed.clear()
+
+# Process-wide cache shared by every scraper
+robots_cache = RobotsCache()
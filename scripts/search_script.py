@@ -1,34 +1,52 @@
 import argparse
 import logging
+import os
 import sys
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from deadline_pool import gather
 from utils import load_config, setup_logging, fetch_from_api, fetch_from_scraper
 from selenium_scraper import get_rendered_html, find_api_endpoints_via_network, extract_data_from_html
 
+# Default limits (seconds) used when config.json does not override them
+DEFAULT_SOURCE_TIMEOUT = 15
+DEFAULT_SEARCH_DEADLINE = 30
+DEFAULT_MAX_WORKERS = 8
+
 def get_args():
     parser = argparse.ArgumentParser(description='Multi-Source Web Scraper')
     parser.add_argument('--query', required=True, help='Search query topic or subject')
     return parser.parse_args()
 
+def fetch_source(source, query, driver_path):
+    if source['type'] == 'api':
+        return fetch_from_api(source['endpoint'], source['query_param'], query)
+    elif source['type'] == 'scraper':
+        return fetch_from_scraper(source['url_pattern'], query, driver_path)
+    raise ValueError(f"Unknown source type: {source['type']}")
+
 def search_sources(query, driver_path):
     config_path = '../config/config.json'
     config = load_config(config_path)
     sources = config['sources']
-    results = []
-
-    for source in sources:
-        try:
-            if source['type'] == 'api':
-                data = fetch_from_api(source['endpoint'], source['query_param'], query)
-            elif source['type'] == 'scraper':
-                data = fetch_from_scraper(source['url_pattern'], query, driver_path)
-            results.append({
-                'source': source['name'],
-                'data': data
-            })
-        except Exception as e:
-            logging.error(f"Failed to fetch data from {source['name']}: {e}")
-
-    return results
+    search_deadline = config.get('search_deadline', DEFAULT_SEARCH_DEADLINE)
+    default_timeout = config.get('source_timeout', DEFAULT_SOURCE_TIMEOUT)
+    max_workers = min(config.get('max_workers', DEFAULT_MAX_WORKERS), len(sources)) or 1
+
+    # Query every source at once; the slowest source (or the global deadline) sets the wall-clock time.
+    # Sources still running at their deadline are abandoned, so they do not delay the exit either.
+    start = time.monotonic()
+    global_deadline = start + search_deadline
+    calls = [(source['name'], fetch_source, (source, query, driver_path),
+              min(start + source.get('timeout', default_timeout), global_deadline)) for source in sources]
+    results = gather(calls, max_workers)
+    collected = {index: {'source': sources[index]['name'], 'data': data} for index, data in results.items()}
+
+    logging.info(f"Searched {len(sources)} sources in {time.monotonic() - start:.2f}s "
+                 f"({len(collected)} succeeded)")
+    # Keep results in the order the sources are configured
+    return [collected[index] for index in sorted(collected)]
 
 def main():
     config_path = '../config/config.json'
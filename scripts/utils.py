@@ -1,41 +1,81 @@
+import atexit
 import json
 import logging
+import logging.handlers
+import queue
 import sys
-from urllib.parse import urlparse
-import urllib.robotparser
 import requests
+from scripts import http_client, metrics
+from scripts.robots_cache import robots_cache
 
 def load_config(config_path):
     with open(config_path, 'r') as f:
         return json.load(f)
 
-def setup_logging(log_path):
-    logging.basicConfig(filename=log_path, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(console_formatter)
-    logging.getLogger().addHandler(console_handler)
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_log_listener = None
+
+def queue_logging(handlers, level=logging.INFO):
+    # The root logger only enqueues records; a listener thread does the formatting and
+    # file/console I/O, so logging calls on the scrape path never wait on disk.
+    global _log_listener
+    stop_logging()
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+        root.removeHandler(handler)
+    log_queue = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    return _log_listener
+
+@atexit.register
+def stop_logging():
+    # Flushes whatever is still queued
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+def setup_logging(log_path, level=logging.INFO, fmt=LOG_FORMAT, console=True):
+    formatter = logging.Formatter(fmt)
+    file_handler = logging.FileHandler(log_path)
+    file_handler.setFormatter(formatter)
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+    return queue_logging(handlers, level)
 
 def can_scrape(url):
-    parsed_url = urlparse(url)
-    robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
-    
-    rp = urllib.robotparser.RobotFileParser()
-    rp.set_url(robots_url)
-    rp.read()
-    
-    return rp.can_fetch("*", url)
+    # robots.txt is fetched once per host and reused until its TTL expires
+    return robots_cache.can_fetch(url)
+
+def wait_for_crawl_delay(url):
+    return robots_cache.wait(url)
+
+def robots_cache_stats():
+    return robots_cache.stats()
 
 def fetch_api_data(url):
     try:
-        response = requests.get(url)
-        response.raise_for_status()
+        with metrics.stage('fetch', 'api'):
+            response = http_client.get(url)
+            response.raise_for_status()
         try:
-            return response.json()  # Assuming the API returns JSON data
+            with metrics.stage('parse', 'api'):
+                data = response.json()  # Assuming the API returns JSON data
+            metrics.increment('pages', component='api', outcome='ok')
+            return data
         except json.JSONDecodeError:
             logging.error("API response is not in JSON format")
+            metrics.increment('pages', component='api', outcome='invalid')
             return None
     except requests.exceptions.RequestException as e:
         logging.error("API request failed: %s", e)
+        metrics.increment('pages', component='api', outcome='error')
         return None
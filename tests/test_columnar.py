@@ -0,0 +1,41 @@
+import glob
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('pyarrow')
+from scripts import columnar
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DATASETS = sorted(os.path.relpath(path, ROOT) for path in glob.glob(os.path.join(ROOT, '**', '*.csv'), recursive=True))
+
+def assert_same_as_read_csv(csv_path, cache_dir):
+    expected = pd.read_csv(csv_path)
+    got = columnar.read_parquet(columnar.ensure_parquet(csv_path, cache_dir))
+    assert list(got.columns) == list(expected.columns)
+    assert dict(got.dtypes) == dict(expected.dtypes)
+    pd.testing.assert_frame_equal(got, expected)
+
+@pytest.mark.parametrize('dataset', DATASETS)
+def test_cached_dataset_matches_read_csv(dataset, tmp_path):
+    csv_path = os.path.join(ROOT, dataset)
+    try:
+        pd.read_csv(csv_path)
+    except (ValueError, pd.errors.ParserError):
+        pytest.skip('pandas cannot parse this file either')
+    assert_same_as_read_csv(csv_path, str(tmp_path))
+
+def test_types_hold_across_batches(tmp_path, monkeypatch):
+    # Columns empty or integral in the first batch and different later keep read_csv's types
+    monkeypatch.setattr(columnar, 'BATCH_ROWS', 2)
+    csv_path = tmp_path / 'drift.csv'
+    csv_path.write_text(',late,count,flag,label\n0,,1,True,a\n1,,2,False,b\n2,1.5,3.5,True,c\n3,x,4,no,d\n')
+    assert_same_as_read_csv(str(csv_path), str(tmp_path / 'cache'))
+
+def test_header_only_file(tmp_path):
+    csv_path = tmp_path / 'empty.csv'
+    csv_path.write_text('a,b,c\n')
+    assert_same_as_read_csv(str(csv_path), str(tmp_path / 'cache'))
@@ -0,0 +1,118 @@
+import csv
+import importlib
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'visualizer')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_scrapper')))
+
+import pytest
+
+from scripts.frontier import Frontier
+
+def page(path):
+    return f"<html><head><title>{path}</title></head><body><h1>{path}</h1><p>About {path}.</p></body></html>"
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = page(self.path).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture(scope='module')
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+class Crash(BaseException):
+    pass
+
+def crash_after(calls, fn):
+    # Lets the first `calls` calls through, then "kills" the process
+    state = {'calls': 0}
+
+    def wrapper(*args, **kwargs):
+        state['calls'] += 1
+        if state['calls'] > calls:
+            raise Crash()
+        return fn(*args, **kwargs)
+    return wrapper
+
+def test_scrape_batch_resume_writes_each_url_once(base_url, tmp_path):
+    scrape = pytest.importorskip('scrape')
+    from scripts import http_client
+    http_client.configure(rate_limit={'rate': 1000.0, 'burst': 100})
+    urls = [f"{base_url}/page/{i}" for i in range(6)]
+    output = str(tmp_path / 'out.ndjson')
+
+    frontier = Frontier(str(tmp_path / 'frontier.db'))
+    # Records reach the file, then the process dies before they are all checkpointed
+    frontier.mark_done = crash_after(1, frontier.mark_done)
+    with pytest.raises(Crash):
+        scrape.scrape_batch(urls, output, concurrency=3, respect_robots=False, frontier=frontier)
+    frontier.close()
+    with open(output, 'a') as f:
+        f.write('{"url": "torn wri')
+
+    frontier = Frontier(str(tmp_path / 'frontier.db'))
+    assert frontier.recovered
+    scrape.scrape_batch(urls, output, concurrency=3, respect_robots=False, frontier=frontier)
+    assert frontier.is_finished()
+    frontier.close()
+
+    with open(output) as f:
+        records = [json.loads(line) for line in f]
+    assert sorted(record['url'] for record in records) == sorted(urls)
+
+@pytest.fixture(scope='module')
+def wikiscrap(tmp_path_factory):
+    pytest.importorskip('psycopg2')
+    # The module reads config.json and opens its log in the working directory at import
+    workdir = tmp_path_factory.mktemp('wikiscrap')
+    with open(workdir / 'config.json', 'w') as f:
+        json.dump({'url': 'https://en.wikipedia.org/wiki/Example', 'output_file': 'out.csv',
+                   'cache_dir': str(workdir / 'http_cache'), 'metrics_summary': ''}, f)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        module = importlib.import_module('python_wikiscrap')
+    finally:
+        os.chdir(cwd)
+    return module
+
+def csv_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+def run_crawl(wikiscrap, monkeypatch, tmp_path, save):
+    monkeypatch.setattr(wikiscrap, 'fetch_page', lambda url: page(url.rsplit('/', 1)[-1]))
+    monkeypatch.setattr(wikiscrap, 'save_to_postgresql', save)
+    frontier = Frontier(str(tmp_path / 'frontier.db'))
+    frontier.add(['https://en.wikipedia.org/wiki/Example'])
+    try:
+        wikiscrap.crawl(frontier, str(tmp_path / 'out.csv'), max_pages=5, max_depth=0)
+    finally:
+        frontier.close()
+
+def test_crawl_retry_after_failed_save_writes_rows_once(wikiscrap, monkeypatch, tmp_path):
+    results = iter([False, True])
+    run_crawl(wikiscrap, monkeypatch, tmp_path, lambda data: next(results))
+    assert [row['text'] for row in csv_rows(tmp_path / 'out.csv')] == ['Example', 'About Example.']
+
+def test_crawl_resume_after_crash_writes_rows_once(wikiscrap, monkeypatch, tmp_path):
+    with pytest.raises(Crash):
+        run_crawl(wikiscrap, monkeypatch, tmp_path, crash_after(0, lambda data: True))
+    run_crawl(wikiscrap, monkeypatch, tmp_path, lambda data: True)
+    assert [row['text'] for row in csv_rows(tmp_path / 'out.csv')] == ['Example', 'About Example.']
@@ -0,0 +1,11 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'visualizer')))
+
+import pytest
+
+pytest.importorskip('streamlit')
+import check_startup
+
+def test_first_page_load_imports_no_deferred_modules():
+    assert check_startup.measure()['deferred_loaded'] == []
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import textwrap
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.deadline_pool import gather
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def slow(value, seconds):
+    time.sleep(seconds)
+    return value
+
+def fail():
+    raise RuntimeError("source down")
+
+def test_gather_returns_results_that_beat_their_deadline():
+    now = time.monotonic()
+    results = gather([
+        ('fast', slow, ('a', 0.0), now + 2),
+        ('late', slow, ('b', 5.0), now + 0.2),
+        ('broken', fail, (), now + 2),
+    ])
+    assert results == {0: 'a'}
+
+def test_process_exits_near_the_deadline_despite_a_slow_source():
+    # The straggler would sleep for 5s; the interpreter must not wait for it at exit
+    script = textwrap.dedent(f"""
+        import sys, time
+        sys.path.append({ROOT!r})
+        from scripts.deadline_pool import gather
+        now = time.monotonic()
+        print(gather([('slow', time.sleep, (5,), now + 0.2), ('fast', abs, (-1,), now + 0.2)]))
+    """)
+    started = time.monotonic()
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=30)
+    elapsed = time.monotonic() - started
+    assert output.returncode == 0, output.stderr
+    assert output.stdout.strip() == "{1: 1}"
+    assert elapsed < 2.5
@@ -0,0 +1,22 @@
+import io
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'visualizer')))
+
+import pytest
+
+pq = pytest.importorskip('pyarrow.parquet')
+import dummy_data_generator
+
+COLUMNS = ['Name', 'Age', 'Email', 'Date', 'Other']
+
+def write(num_rows):
+    buffer = io.BytesIO()
+    dummy_data_generator.write_dummy_parquet(buffer, num_rows, COLUMNS, seed=1, chunk_rows=4)
+    return pq.read_table(io.BytesIO(buffer.getvalue()))
+
+def test_zero_rows_writes_an_empty_table_with_the_schema():
+    table = write(0)
+    assert table.num_rows == 0
+    assert table.schema.names == COLUMNS
+    assert table.schema.equals(write(10).schema)
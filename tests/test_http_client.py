@@ -0,0 +1,53 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+http_client = pytest.importorskip('scripts.http_client')
+
+class Throttling(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    hits = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        Throttling.hits += 1
+        status = 429 if self.path == '/always' else (429 if Throttling.hits % 2 else 200)
+        self.send_response(status)
+        self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+@pytest.fixture
+def server():
+    Throttling.hits = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Throttling)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_each_limiter_acquisition_hits_the_host_once(server):
+    http_client.configure(throttle_retries=3, rate_limit={'rate': 1000.0, 'burst': 100})
+    host = f"127.0.0.1:{server.server_address[1]}"
+    response = http_client.get(f"http://{host}/always")
+    assert response.status_code == 429
+    stats = http_client.rate_limit_stats()[host]
+    # throttle_retries + 1 acquisitions, and urllib3 did not retry behind the limiter's back
+    assert stats['requests'] == 4
+    assert stats['throttled'] == 4
+    assert Throttling.hits == 4
+
+def test_intermittent_throttling_lowers_the_host_rate(server):
+    http_client.configure(throttle_retries=3, rate_limit={'rate': 1000.0, 'burst': 100})
+    host = f"127.0.0.1:{server.server_address[1]}"
+    assert http_client.get(f"http://{host}/sometimes").status_code == 200
+    stats = http_client.rate_limit_stats()[host]
+    assert stats['throttled'] == 1
+    assert stats['rate'] < 1000.0
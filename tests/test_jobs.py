@@ -0,0 +1,61 @@
+import os
+import sys
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.jobs import JobQueue, CANCELLED, DONE
+
+def finish_then_get_cancelled(value, token):
+    # The cancel lands after the last check(), while the result is on its way back
+    token.check()
+    open(token.path, 'w').close()
+    return value
+
+def double(value, token):
+    token.check()
+    return value * 2
+
+def wait_finished(queue, job_id, on_finish_called):
+    assert on_finish_called.wait(60)
+    return queue.get(job_id)
+
+def test_cancel_after_last_check_is_not_reported_done(tmp_path):
+    queue = JobQueue(max_workers=1, job_dir=str(tmp_path))
+    results = []
+    finished = threading.Event()
+    try:
+        job_id = queue.submit(finish_then_get_cancelled, 21, on_success=results.append,
+                              on_finish=lambda job: finished.set())
+        job = wait_finished(queue, job_id, finished)
+    finally:
+        queue.shutdown()
+    assert job.status == CANCELLED
+    assert job.result is None
+    assert results == []
+    assert not os.path.exists(job.token.path)
+
+def test_jobs_run_in_spawned_workers(tmp_path):
+    queue = JobQueue(max_workers=1, job_dir=str(tmp_path))
+    results = []
+    finished = threading.Event()
+    try:
+        job_id = queue.submit(double, 21, on_success=results.append, on_finish=lambda job: finished.set())
+        job = wait_finished(queue, job_id, finished)
+        # Forking the threaded server could copy a lock held by another thread
+        assert queue._executor._mp_context.get_start_method() == 'spawn'
+    finally:
+        queue.shutdown()
+    assert job.status == DONE
+    assert results == [42]
+
+def test_cancel_of_finished_job_leaves_no_marker(tmp_path):
+    queue = JobQueue(max_workers=1, job_dir=str(tmp_path))
+    finished = threading.Event()
+    try:
+        job_id = queue.submit(double, 1, on_finish=lambda job: finished.set())
+        wait_finished(queue, job_id, finished)
+        job = queue.cancel(job_id)
+    finally:
+        queue.shutdown()
+    assert job.status == DONE
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,23 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.rate_limit import RateLimiter
+
+URL = 'https://example.org/wiki/Page'
+
+def test_crawl_delay_cap_survives_configure():
+    limiter = RateLimiter(rate=10.0)
+    limiter.cap_rate('https://example.org/robots.txt', 0.5)
+    assert limiter.stats()['example.org']['base_rate'] == 0.5
+
+    # A config reload rebuilds the buckets but must keep the robots.txt ceiling
+    limiter.configure(rate=20.0)
+    limiter.acquire(URL)
+    assert limiter.stats()['example.org']['base_rate'] == 0.5
+
+def test_cap_is_lifted_when_cleared():
+    limiter = RateLimiter(rate=10.0)
+    limiter.cap_rate(URL, 0.5)
+    limiter.cap_rate(URL, None)
+    assert limiter.stats()['example.org']['base_rate'] == 10.0
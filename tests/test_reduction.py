@@ -0,0 +1,23 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'visualizer')))
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+import reduction
+
+def test_bar_with_the_same_column_on_both_axes_is_reduced():
+    df = pd.DataFrame({'score': [i % 200 for i in range(20000)]})
+    chart_df, reduced = reduction.reduce_bar(df, 'score', 'score', top_k=50, budget=5000)
+    assert reduced
+    assert len(chart_df) == 50
+    assert list(chart_df.columns) == ['score', 'count']
+    assert chart_df['count'].sum() == len(df)
+    assert chart_df['score'].iloc[-1] == reduction.OTHERS_LABEL
+
+def test_bar_with_few_values_on_both_axes_counts_them():
+    df = pd.DataFrame({'score': [1, 2, 2, 3, 3, 3]})
+    chart_df, reduced = reduction.reduce_bar(df, 'score', 'score')
+    assert not reduced
+    assert dict(zip(chart_df['score'], chart_df['count'])) == {1: 1, 2: 2, 3: 3}
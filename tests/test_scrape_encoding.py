@@ -0,0 +1,53 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'visualizer')))
+
+import pytest
+
+scrape = pytest.importorskip('scrape')
+from scripts.extraction import decode_chunks
+
+TITLE = "Zürich – Ελληνικά – 東京"
+PAGES = {
+    '/meta': f'<html><head><meta charset="utf-8"><title>{TITLE}</title></head><body></body></html>'.encode('utf-8'),
+    '/plain': f'<html><head><title>{TITLE}</title></head><body></body></html>'.encode('utf-8'),
+    '/latin': '<html><head><meta http-equiv="Content-Type" content="text/html; charset=iso-8859-1">'
+              '<title>Café</title></head></html>'.encode('latin-1'),
+}
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = PAGES[self.path]
+        self.send_response(200)
+        # No charset parameter: requests would decode this as ISO-8859-1
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture(scope='module')
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+@pytest.mark.parametrize('path', ['/meta', '/plain'])
+def test_utf8_page_without_header_charset(base_url, path):
+    assert scrape.scrape_page(base_url + path)['title'] == TITLE
+
+def test_meta_charset_other_than_utf8(base_url):
+    assert scrape.scrape_page(base_url + '/latin')['title'] == 'Café'
+
+def test_decode_chunks_splits_multibyte_characters():
+    data = TITLE.encode('utf-8')
+    chunks = [data[i:i + 3] for i in range(0, len(data), 3)]
+    assert ''.join(decode_chunks(chunks, 'utf-8')) == TITLE
+    assert ''.join(decode_chunks(chunks)) == TITLE
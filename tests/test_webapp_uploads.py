@@ -0,0 +1,57 @@
+import io
+import os
+import sys
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'webapp')))
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('plotly')
+webapp = pytest.importorskip('app')
+
+CSV = (b"Year,Country of origin,Country of asylum,Recognized decisions,Rejected decisions\n"
+       b"2020,Syria,Germany,10,2\n2021,Syria,France,5,1\n2021,Iraq,Germany,3,4\n")
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(webapp.app.config, 'UPLOAD_STORE', str(tmp_path / 'uploads'))
+    webapp.result_cache._entries.clear()
+    webapp.result_cache.total_bytes = 0
+    webapp.app.config['TESTING'] = True
+    return webapp.app.test_client()
+
+def stored_uploads(tmp_path):
+    return [name for name in os.listdir(tmp_path / 'uploads') if name.endswith('.csv')]
+
+def upload(client, data=CSV):
+    return {'file': (io.BytesIO(data), 'data.csv')}
+
+def test_upload_is_removed_after_synchronous_analysis(client, tmp_path, monkeypatch):
+    monkeypatch.setitem(webapp.app.config, 'BACKGROUND_JOBS', False)
+    for _ in range(2):
+        # First a fresh analysis, then a result-cache hit
+        assert client.post('/', data=upload(client), content_type='multipart/form-data').status_code == 200
+        assert stored_uploads(tmp_path) == []
+    assert webapp.upload_users == {}
+
+def test_upload_is_removed_after_background_job(client, tmp_path):
+    response = client.post('/jobs', data=upload(client), content_type='multipart/form-data')
+    assert response.status_code == 202
+    result_url = response.get_json()['result_url']
+    deadline = time.monotonic() + 30
+    while client.get(result_url).status_code == 202:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert client.get(result_url).get_json()['status'] == 'done'
+    # on_finish runs right after the status is stored
+    while webapp.upload_users and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert stored_uploads(tmp_path) == []
+
+    # A re-upload is answered from the result cache and leaves nothing behind either
+    response = client.post('/jobs', data=upload(client), content_type='multipart/form-data')
+    assert response.get_json()['status'] == 'done'
+    assert stored_uploads(tmp_path) == []
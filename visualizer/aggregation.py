@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.result_cache import ResultCache
+
+# Share of the total below which a pie slice is folded into "Others"
+PIE_THRESHOLD = 0.01
+OTHERS_LABEL = 'Others'
+GROUPBY_CACHE_BYTES = 128 * 1024 * 1024
+
+# Grouped totals per (dataset key, group columns, value column), shared by every chart that
+# groups the same data, so re-rendering a chart or switching chart types does not regroup
+groupby_cache = ResultCache(GROUPBY_CACHE_BYTES)
+
+def group_sum(df, by, value, df_key=None):
+    # Sums only the value column per group; the result must be treated as read-only
+    by = [by] if isinstance(by, str) else list(by)
+    cache_key = (df_key, tuple(by), value) if df_key is not None else None
+    if cache_key is not None:
+        grouped = groupby_cache.get(cache_key)
+        if grouped is not None:
+            return grouped
+    grouped = df.groupby(by, observed=True)[value].sum().reset_index()
+    if cache_key is not None:
+        groupby_cache.put(cache_key, grouped, int(grouped.memory_usage(deep=True).sum()))
+    return grouped
+
+def pie_slices(df, label, value, df_key=None, threshold=PIE_THRESHOLD, others_label=OTHERS_LABEL):
+    # Returns (labels, values) with every slice under threshold of the total merged into one
+    grouped = group_sum(df, label, value, df_key)
+    values = grouped[value].to_numpy()
+    keep = values >= threshold * values.sum()
+    labels = grouped[label].to_numpy()[keep].tolist()
+    data = values[keep].tolist()
+    others = values[~keep].sum()
+    if others > 0:
+        labels.append(others_label)
+        data.append(others.item())
+    return labels, data
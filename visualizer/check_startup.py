@@ -0,0 +1,54 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_dashboard.py')
+
+# Runs in a fresh interpreter so nothing is imported before the measurement starts.
+# Executing the script outside `streamlit run` uses streamlit's bare mode: widgets return
+# their defaults, so this times exactly what a first page load does before any interaction.
+PROBE = """
+import json, logging, runpy, sys, time
+logging.disable(logging.CRITICAL)
+started = time.perf_counter()
+import streamlit
+baseline = set(sys.modules)
+streamlit_seconds = time.perf_counter() - started
+started = time.perf_counter()
+namespace = runpy.run_path(sys.argv[1], run_name='__main__')
+elapsed = time.perf_counter() - started
+deferred = namespace.get('DEFERRED_MODULES', [])
+print(json.dumps({
+    'streamlit_import_seconds': round(streamlit_seconds, 3),
+    'dashboard_seconds': round(elapsed, 3),
+    'modules_loaded': len(set(sys.modules) - baseline),
+    'deferred_loaded': [name for name in deferred if name in sys.modules and name not in baseline]
+}))
+"""
+
+def measure(dashboard=DASHBOARD):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run([sys.executable, '-c', PROBE, dashboard], capture_output=True, text=True,
+                            cwd=os.path.dirname(dashboard), env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"probe exited with {result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the dashboard's cold-start import time against a budget.")
+    parser.add_argument('--budget', type=float, default=float(os.environ.get('DASHBOARD_STARTUP_BUDGET', '1.5')),
+                        help="Seconds the dashboard script may take on a cold start (excluding streamlit itself)")
+    parser.add_argument('--runs', type=int, default=3, help="Cold starts to measure; the fastest is reported")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(max(args.runs, 1))]
+    report = min(runs, key=lambda run: run['dashboard_seconds'])
+    report['budget_seconds'] = args.budget
+    report['ok'] = report['dashboard_seconds'] <= args.budget and not report['deferred_loaded']
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report['ok'] else 1)
+
+if __name__ == '__main__':
+    main()
@@ -1,62 +1,51 @@
+import time
+import sys
+
+# Startup timing covers everything below, including the streamlit import
+STARTUP_STARTED = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
-import csv
+# Whatever streamlit loads itself is not counted against the dashboard
+STARTUP_MODULES = set(sys.modules)
 import os
-import requests
-import shutil
-import subprocess
-import sys
 import json
+import logging
 import streamlit.components.v1 as components
-from dummy_data_generator import generate_dummy_data, generate_csv_from_dummy_data
-import plotly.express as px
-from scrape import scrape_data
-
-
-# Function to install Kaggle package
-def install_kaggle():
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "kaggle"])
-
-# Try to import Kaggle API, install if not available
-try:
-    from kaggle.api.kaggle_api_extended import KaggleApi
-except ImportError:
-    install_kaggle()
-    from kaggle.api.kaggle_api_extended import KaggleApi
-
-# Copy the kaggle.json file to the correct location
-def setup_kaggle_api():
-    kaggle_json_src = os.path.join(os.path.dirname(__file__), 'kaggle.json')
-    kaggle_dir = os.path.expanduser('~/.kaggle')
-    kaggle_json_dest = os.path.join(kaggle_dir, 'kaggle.json')
-    
-    if not os.path.exists(kaggle_json_src):
-        raise FileNotFoundError(f"Could not find {kaggle_json_src}. Ensure the kaggle.json file is present in the specified location.")
-    
-    if not os.path.exists(kaggle_dir):
-        os.makedirs(kaggle_dir)
-    
-    shutil.copy(kaggle_json_src, kaggle_json_dest)
-    os.chmod(kaggle_json_dest, 0o600)  # Set appropriate permissions
-
-setup_kaggle_api()
-
-# Initialize Kaggle API
-api = KaggleApi()
-api.authenticate()
-
-# Data.gov API key
-DATA_GOV_API_KEY = 'fzybhxMQcRYVilL2vl3LDyfrBDThL3gBCwi69S55'
-
-# Function to authenticate Data.gov API
-def authenticate_datagov(api_key):
-    headers = {"X-Api-Key": api_key}
-    return headers
-
-headers = authenticate_datagov(DATA_GOV_API_KEY)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Data-source clients (Kaggle install/auth, the HTTP session) are created on first use;
+# plotly, pyarrow, the chart reduction (numpy/pandas) and the scrapers are imported
+# inside the handlers that need them
+import providers
+import aggregation
+from scripts import metrics
+
+# Seconds a cold start may take before it is logged as a regression
+STARTUP_BUDGET = float(os.environ.get("DASHBOARD_STARTUP_BUDGET", "1.5"))
+# Modules that must not be imported before the first widget renders
+DEFERRED_MODULES = ["plotly", "kaggle", "requests", "bs4", "pyarrow"]
+# Most points a single chart sends to the browser; larger datasets are reduced server-side
+POINT_BUDGET = int(os.environ.get("DASHBOARD_POINT_BUDGET", "5000"))
+# Rows the Generate Dummy Data tab allows; bigger files are better written with the CLI
+DUMMY_MAX_ROWS = int(os.environ.get("DASHBOARD_DUMMY_MAX_ROWS", "2000000"))
+
+def check_startup(started=STARTUP_STARTED, modules_before=STARTUP_MODULES, budget=STARTUP_BUDGET):
+    elapsed = time.perf_counter() - started
+    loaded = [name for name in DEFERRED_MODULES if name in sys.modules and name not in modules_before]
+    if elapsed > budget:
+        logging.warning("Dashboard startup took %.2fs (budget %.2fs)", elapsed, budget)
+    if loaded:
+        logging.warning("Dashboard startup imported deferred modules: %s", ", ".join(loaded))
+    return elapsed, loaded
+
+# Times the browser payload build for one chart (figure serialization or inline Chart.js)
+def render_plotly(fig):
+    with metrics.stage('render', 'dashboard'):
+        st.plotly_chart(fig)
 
 # Streamlit app title
 st.title("HRVST Data Dashboard")
+check_startup()
 
 # Initialize session state
 if "search_results" not in st.session_state:
@@ -68,105 +57,47 @@ if "selected_dataset_index" not in st.session_state:
 if "scraped_file_name" not in st.session_state:
     st.session_state.scraped_file_name = ""
 
-# Function to parse CSV files
-def parse_csv(uploaded_file):
-    content = uploaded_file.getvalue().decode("utf-8")
-    lines = content.splitlines()
-    
-    # Dynamically detect the delimiter
-    delimiter = csv.Sniffer().sniff(lines[0]).delimiter
-    
-    # Read the CSV file
-    reader = csv.reader(lines, delimiter=delimiter)
-    
-    headers = None
-    rows = []
-    for row in reader:
-        if headers is None:
-            headers = row
-        else:
-            rows.append(row)
-    
-    if headers is None:
-        raise ValueError("Could not detect headers in the CSV file")
-    
-    # Create DataFrame and handle varying number of columns
-    df = pd.DataFrame(rows, columns=headers)
-    
-    # Drop any completely empty columns
-    df.dropna(axis=1, how='all', inplace=True)
-    
-    return df
-
-# Function to convert columns to numeric
-def convert_to_numeric(df):
-    for col in df.columns:
-        try:
-            df[col] = pd.to_numeric(df[col])
-        except ValueError:
-            st.warning(f"Column {col} could not be converted to numeric.")
-    return df
-
 # Function to clean data
 def clean_data(df):
     # Fill missing values with zeros
     df.fillna(0, inplace=True)
     return df
 
-# Function to search and download Kaggle datasets
-def search_kaggle_datasets(query):
-    datasets = api.dataset_list(search=query)
-    dataset_info = [(dataset.ref, dataset.title) for dataset in datasets]
-    return dataset_info
-
-def download_kaggle_dataset(dataset_ref, download_path):
-    try:
-        api.dataset_download_files(dataset_ref, path=download_path, unzip=True)
-        for file in os.listdir(download_path):
-            if file.endswith(".csv"):
-                return os.path.join(download_path, file)
-    except Exception as e:
-        st.error(f"Error downloading dataset: {e}")
-    return None
+# Parsed uploads are cached by content hash, so widget reruns reuse the frame instead of
+# re-parsing it. Returns the cleaned frame and the columns that stayed non-numeric.
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_uploaded_frame(upload_key, _data):
+    from scripts import columnar
+    df = columnar.read_frame(upload_key)
+    if df is not None:
+        # The non-numeric columns are stored with the frame so the warnings survive a restart
+        failed = (columnar.read_frame_metadata(upload_key) or {}).get('failed')
+        if failed is None:
+            failed = df.select_dtypes(include=['object', 'string']).columns.tolist()
+    else:
+        df = columnar.read_csv_buffer(_data)
+        df, failed = columnar.coerce_numeric(df)
+        columnar.write_frame(df, upload_key, metadata={'failed': failed})
+    return clean_data(df), failed
 
-# Function to search Data.gov datasets
-def search_datagov_datasets(query, headers):
-    response = requests.get(f"https://catalog.data.gov/api/3/action/package_search?q={query}", headers=headers)
-    response.raise_for_status()
-    results = response.json()["result"]["results"]
-    dataset_info = [(dataset["id"], dataset["title"]) for dataset in results]
-    return dataset_info
-
-# Function to download Data.gov dataset
-def download_datagov_dataset(dataset_id, headers, download_path):
-    response = requests.get(f"https://catalog.data.gov/api/3/action/package_show?id={dataset_id}", headers=headers)
-    response.raise_for_status()
-    resources = response.json()["result"]["resources"]
-    for resource in resources:
-        if resource["format"].lower() == "csv":
-            download_url = resource["url"]
-            csv_data = requests.get(download_url).content
-            with open(download_path, "wb") as file:
-                file.write(csv_data)
-            return download_path
-    return None
+@st.cache_data(show_spinner=False, max_entries=8)
+def get_numeric_columns(df_key, _df):
+    return _df.select_dtypes(include=['number']).columns.tolist()
 
 # Function to switch between different data sources
 def search_datasets(query, source):
-    if source == "Kaggle":
-        return search_kaggle_datasets(query)
-    elif source == "Data.gov":
-        return search_datagov_datasets(query, headers)
-    else:
+    if source not in providers.PROVIDERS:
         return []
+    return providers.get_provider(source).search(query)
 
 def download_dataset(dataset_ref, download_path, source):
-    if source == "Kaggle":
-        return download_kaggle_dataset(dataset_ref, download_path)
-    elif source == "Data.gov":
-        return download_datagov_dataset(dataset_ref, headers, download_path)
-    else:
+    if source not in providers.PROVIDERS:
         return None
+    try:
+        return providers.get_provider(source).download(dataset_ref, download_path)
+    except Exception as e:
+        st.error(f"Error downloading dataset: {e}")
+    return None
 
 st.sidebar.title("Scrape URL")
 
@@ -189,6 +120,7 @@ if st.sidebar.button("Scrape and Save as JSON"):
             
             output_file_path = os.path.join(output_dir, json_file_name)
             
+            from scrape import scrape_data
             scrape_data(scrape_url, output_file_path)
             with open(output_file_path, "r") as file:
                 json_data = file.read()
@@ -214,7 +146,7 @@ if 'scraped_data' in st.session_state:
 
 # Sidebar for selecting data source
 st.sidebar.title("Search for Datasets")
-data_source = st.sidebar.selectbox("Select Data Source", ["Kaggle", "Data.gov"])
+data_source = st.sidebar.selectbox("Select Data Source", providers.provider_names())
 
 # User enters a topic to search for datasets
 search_topic = st.sidebar.text_input("Enter a topic to search for datasets")
@@ -247,10 +179,12 @@ if st.session_state.search_results:
                 selected_dataset_ref = st.session_state.search_results[st.session_state.selected_dataset_index][0]
                 download_path = f"./{st.session_state.scraped_file_name}"
                 with st.spinner("Downloading dataset..."):
-                    csv_file_path = download_kaggle_dataset(selected_dataset_ref, download_path)
+                    csv_file_path = download_dataset(selected_dataset_ref, download_path, data_source)
                 
                 if csv_file_path:
-                    scraped_df = pd.read_csv(csv_file_path)
+                    # Converted to Parquet once; later reads skip CSV tokenizing
+                    from scripts import columnar
+                    scraped_df = columnar.load_dataset(csv_file_path)
                     st.write("Here is a preview of the scraped data:")
                     st.write(scraped_df.head())
                     
@@ -282,7 +216,14 @@ with tab1:
 
     if uploaded_file is not None:
         try:
-            df = parse_csv(uploaded_file)
+            # Parsed once per distinct upload (and kept as Parquet by content hash);
+            # reruns triggered by other widgets get the cached frame
+            from scripts.columnar import content_hash
+            upload_key = content_hash(uploaded_file.getbuffer())
+            with metrics.stage('parse', 'dashboard'):
+                df, non_numeric = load_uploaded_frame(upload_key, uploaded_file.getbuffer())
+            for col in non_numeric:
+                st.warning(f"Column {col} could not be converted to numeric.")
             
             st.write("Here is a preview of your uploaded CSV file:")
             st.write(df.head())
@@ -290,37 +231,46 @@ with tab1:
             st.write("The columns in the uploaded CSV file are:")
             st.write(df.columns.tolist())
 
-            # Convert numeric columns to numeric types
-            df = convert_to_numeric(df)
-            
-            # Clean data
-            df = clean_data(df)
-
             # Store in session state for use in other tabs
             st.session_state.df = df
+            st.session_state.df_key = upload_key
         except Exception as e:
             st.error(f"An error occurred: {e}")
 
 # Tab 2: Generate Dummy Data
 with tab2:
     st.header("Generate Dummy Data")
-    num_rows = st.number_input("Number of rows", min_value=1, max_value=1000, value=10)
+    num_rows = st.number_input("Number of rows", min_value=1, max_value=DUMMY_MAX_ROWS, value=10)
+    seed = st.number_input("Seed", min_value=0, value=0, help="The same seed and columns always give the same data")
     columns_input = st.text_area("Enter column names (comma-separated)", "Name, Age, Email, Date")
+    dummy_format = st.radio("Download format", ["CSV", "Parquet"], horizontal=True)
 
     if st.button("Generate Dummy Data"):
         columns = [col.strip() for col in columns_input.split(",") if col.strip()]
         if columns:
-            dummy_df = generate_dummy_data(num_rows, columns)
+            import dummy_data_generator
+            dummy_df = dummy_data_generator.generate_dummy_data(int(num_rows), columns, seed=int(seed))
             st.write("Here is a preview of the generated dummy data:")
             st.write(dummy_df.head())
             
-            csv_data = generate_csv_from_dummy_data(dummy_df)
-            st.download_button(
-                label="Download generated data as CSV",
-                data=csv_data,
-                file_name="dummy_data.csv",
-                mime='text/csv'
-            )
+            # Only the chosen format is built, from the frame generated above
+            if dummy_format == "Parquet" and not dummy_data_generator.parquet_available():
+                st.warning("Parquet output needs pyarrow; offering CSV instead.")
+                dummy_format = "CSV"
+            if dummy_format == "Parquet":
+                st.download_button(
+                    label="Download generated data as Parquet",
+                    data=dummy_data_generator.generate_parquet_from_dummy_data(dummy_df),
+                    file_name="dummy_data.parquet",
+                    mime='application/octet-stream'
+                )
+            else:
+                st.download_button(
+                    label="Download generated data as CSV",
+                    data=dummy_data_generator.generate_csv_from_dummy_data(dummy_df),
+                    file_name="dummy_data.csv",
+                    mime='text/csv'
+                )
             st.success("Data generated successfully!")
         else:
             st.warning("Please enter at least one column name.")
@@ -333,10 +283,11 @@ with tab3:
         df = st.session_state.df
 
         # Filter numeric columns for value selection
-        numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
+        numeric_columns = get_numeric_columns(st.session_state.get('df_key'), df)
 
         # Select type of visualization
         visualization_type = st.selectbox("Select visualization type:", ["Sunburst Chart", "Bar Chart", "Line Chart", "Scatter Plot", "Chart.js"])
+        point_budget = st.number_input("Maximum points per chart", min_value=100, max_value=100000, value=POINT_BUDGET, step=100)
 
         if visualization_type == "Sunburst Chart":
             with st.form(key='sunburst_form'):
@@ -346,11 +297,13 @@ with tab3:
 
             if submit_button and path_columns and value_column:
                 try:
-                    grouped_df = df.groupby(path_columns).sum().reset_index()
+                    # Only the value column is summed, and the grouping is reused across reruns
+                    grouped_df = aggregation.group_sum(df, path_columns, value_column, st.session_state.get('df_key'))
                     
                     if grouped_df[value_column].sum() == 0:
                         st.warning("The selected values column sums to zero. Please select a different column or ensure the data is correct.")
                     else:
+                        import plotly.express as px
                         fig = px.sunburst(
                             grouped_df,
                             path=path_columns,
@@ -361,7 +314,7 @@ with tab3:
                             color=value_column,
                             hover_data=path_columns
                         )
-                        st.plotly_chart(fig)
+                        render_plotly(fig)
                 except Exception as e:
                     st.error(f"An error occurred: {e}")
 
@@ -373,15 +326,23 @@ with tab3:
             
             if submit_button and x_column and y_column:
                 try:
+                    # Category totals, top K plus "Others"
+                    import reduction
+                    chart_df, reduced = reduction.reduce_bar(df, x_column, y_column, top_k=min(point_budget, reduction.BAR_TOP_K), budget=point_budget)
+                    if reduced:
+                        measure = "count" if x_column == y_column else f"total {y_column}"
+                        st.caption(f"Showing the top {len(chart_df) - 1} {x_column} values by {measure}; the rest are grouped as Others.")
+                    import plotly.express as px
+                    # The bar heights are the last column: y itself, or value counts when x is y
                     fig = px.bar(
-                        df,
+                        chart_df,
                         x=x_column,
-                        y=y_column,
+                        y=chart_df.columns[-1],
                         title="Bar Chart",
                         height=600,
                         color_continuous_scale='RdBu'
                     )
-                    st.plotly_chart(fig)
+                    render_plotly(fig)
                 except Exception as e:
                     st.error(f"An error occurred: {e}")
 
@@ -393,15 +354,21 @@ with tab3:
             
             if submit_button and x_column and y_column:
                 try:
+                    # LTTB keeps the shape of the line with at most point_budget points
+                    import reduction
+                    chart_df, reduced = reduction.reduce_line(df, x_column, y_column, point_budget)
+                    if reduced:
+                        st.caption(f"Downsampled from {len(df):,} to {len(chart_df):,} points.")
+                    import plotly.express as px
                     fig = px.line(
-                        df,
+                        chart_df,
                         x=x_column,
                         y=y_column,
                         title="Line Chart",
                         height=600,
                         color_continuous_scale='RdBu'
                     )
-                    st.plotly_chart(fig)
+                    render_plotly(fig)
                 except Exception as e:
                     st.error(f"An error occurred: {e}")
 
@@ -413,15 +380,23 @@ with tab3:
             
             if submit_button and x_column and y_column:
                 try:
+                    # Large point clouds are binned; each point is a cell coloured by how many rows it holds
+                    import reduction
+                    chart_df, reduced = reduction.reduce_scatter(df, x_column, y_column, point_budget)
+                    density = reduced and 'count' in chart_df.columns
+                    if reduced:
+                        st.caption(f"{len(df):,} rows reduced to {len(chart_df):,} points.")
+                    import plotly.express as px
                     fig = px.scatter(
-                        df,
+                        chart_df,
                         x=x_column,
                         y=y_column,
                         title="Scatter Plot",
                         height=600,
+                        color='count' if density else None,
                         color_continuous_scale='RdBu'
                     )
-                    st.plotly_chart(fig)
+                    render_plotly(fig)
                 except Exception as e:
                     st.error(f"An error occurred: {e}")
 
@@ -434,32 +409,20 @@ with tab3:
                 
             if submit_button and labels_column and data_column:
                 try:
-                    # Aggregate data for pie chart
+                    # Aggregate data for pie chart; slices under 1% of the total are merged into 'Others'
                     if chart_type == "pie":
-                        aggregated_data = df.groupby(labels_column)[data_column].sum().reset_index()
-                        labels = aggregated_data[labels_column].tolist()
-                        data = aggregated_data[data_column].tolist()
+                        labels, data = aggregation.pie_slices(df, labels_column, data_column, st.session_state.get('df_key'))
                     else:
-                        labels = df[labels_column].tolist()
-                        data = df[data_column].tolist()
-
-                    # Aggregate smaller slices into 'Others'
-                    if chart_type == "pie":
-                        threshold = 0.01 * sum(data)  # 1% threshold
-                        new_labels = []
-                        new_data = []
-                        others_value = 0
-                        for label, value in zip(labels, data):
-                            if value >= threshold:
-                                new_labels.append(label)
-                                new_data.append(value)
-                            else:
-                                others_value += value
-                        if others_value > 0:
-                            new_labels.append('Others')
-                            new_data.append(others_value)
-                        labels = new_labels
-                        data = new_data
+                        # Chart.js data is inlined into the page, so it goes through the same reduction
+                        import reduction
+                        if chart_type == "bar":
+                            chart_df, reduced = reduction.reduce_bar(df, labels_column, data_column, top_k=min(point_budget, reduction.BAR_TOP_K), budget=point_budget)
+                        else:
+                            chart_df, reduced = reduction.reduce_line(df, labels_column, data_column, point_budget)
+                        if reduced:
+                            st.caption(f"Reduced from {len(df):,} rows to {len(chart_df):,} points.")
+                        labels = chart_df[labels_column].tolist()
+                        data = chart_df[chart_df.columns[-1]].tolist()
 
                     chart_data = {
                         "type": chart_type,
@@ -523,8 +486,13 @@ with tab3:
                     new Chart(ctx, {chart_json});
                     </script>
                     """
-                    components.html(chart_html, height=600)
+                    with metrics.stage('render', 'dashboard'):
+                        components.html(chart_html, height=600)
                 except Exception as e:
                     st.error(f"An error occurred: {e}")
     else:
-        st.write("Please upload a CSV file to proceed.")
\ No newline at end of file
+        st.write("Please upload a CSV file to proceed.")
+
+# Stage timings for this server process
+with st.sidebar.expander("Timings"):
+    st.json(metrics.summary()['timers'])
@@ -1,22 +1,121 @@
+import argparse
+import io
+import numpy as np
 import pandas as pd
-import random
-
-def generate_dummy_data(num_rows, columns):
-    data = {col: [generate_dummy_value(col) for _ in range(num_rows)] for col in columns}
-    df = pd.DataFrame(data)
-    return df
-
-def generate_dummy_value(column_name):
-    if "name" in column_name.lower():
-        return random.choice(["Alice", "Bob", "Charlie", "David", "Eve"])
-    elif "age" in column_name.lower():
-        return random.randint(18, 70)
-    elif "email" in column_name.lower():
-        return random.choice(["example1@example.com", "example2@example.com", "example3@example.com"])
-    elif "date" in column_name.lower():
-        return random.choice(["2021-01-01", "2021-06-15", "2022-03-22", "2023-08-30"])
+
+# pyarrow is optional: without it only CSV output is available
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+CHUNK_ROWS = 100000
+
+NAMES = ["Alice", "Bob", "Charlie", "David", "Eve"]
+EMAILS = ["example1@example.com", "example2@example.com", "example3@example.com"]
+DATES = ["2021-01-01", "2021-06-15", "2022-03-22", "2023-08-30"]
+VALUES = ["Value1", "Value2", "Value3", "Value4"]
+
+def _choice(values):
+    values = np.array(values, dtype=object)
+    return lambda rng, size: values[rng.integers(0, len(values), size=size)]
+
+def _ages(rng, size):
+    return rng.integers(18, 71, size=size)
+
+def column_rule(column_name):
+    # Resolved once per column; returns fn(rng, size) -> array of size values
+    name = column_name.lower()
+    if "name" in name:
+        return _choice(NAMES)
+    elif "age" in name:
+        return _ages
+    elif "email" in name:
+        return _choice(EMAILS)
+    elif "date" in name:
+        return _choice(DATES)
     else:
-        return random.choice(["Value1", "Value2", "Value3", "Value4"])
+        return _choice(VALUES)
+
+def iter_dummy_chunks(num_rows, columns, seed=None, chunk_rows=CHUNK_ROWS):
+    # Each column draws from its own generator spawned from the seed, so the output for a
+    # given seed is the same whatever the chunk size
+    rules = [column_rule(col) for col in columns]
+    rngs = [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(len(columns))]
+    for start in range(0, num_rows, chunk_rows):
+        size = min(chunk_rows, num_rows - start)
+        yield pd.DataFrame({col: rule(rng, size) for col, rule, rng in zip(columns, rules, rngs)},
+                           index=pd.RangeIndex(start, start + size))
+
+def generate_dummy_data(num_rows, columns, seed=None):
+    chunks = list(iter_dummy_chunks(num_rows, columns, seed, chunk_rows=max(num_rows, 1)))
+    return chunks[0] if chunks else pd.DataFrame(columns=columns)
+
+def generate_dummy_value(column_name, rng=None):
+    return column_rule(column_name)(rng or np.random.default_rng(), 1)[0]
 
 def generate_csv_from_dummy_data(df):
-    return df.to_csv(index=False).encode('utf-8')
\ No newline at end of file
+    return df.to_csv(index=False).encode('utf-8')
+
+def write_dummy_csv(target, num_rows, columns, seed=None, chunk_rows=CHUNK_ROWS):
+    # target is a path or a text buffer; rows are written chunk by chunk
+    if isinstance(target, str):
+        with open(target, 'w', newline='') as f:
+            return write_dummy_csv(f, num_rows, columns, seed, chunk_rows)
+    header = True
+    for chunk in iter_dummy_chunks(num_rows, columns, seed, chunk_rows):
+        chunk.to_csv(target, index=False, header=header)
+        header = False
+    if header:
+        pd.DataFrame(columns=columns).to_csv(target, index=False)
+    return target
+
+def write_dummy_parquet(target, num_rows, columns, seed=None, chunk_rows=CHUNK_ROWS):
+    # One row group per chunk; target is a path or a binary buffer
+    if pa is None:
+        raise RuntimeError("Writing Parquet needs pyarrow; use CSV output instead")
+    writer = None
+    try:
+        for chunk in iter_dummy_chunks(num_rows, columns, seed, chunk_rows):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema)
+            writer.write_table(table)
+        if writer is None:
+            # No rows: still a readable file, typed as a non-empty one would be
+            schema = pa.Table.from_pandas(next(iter_dummy_chunks(1, columns)), preserve_index=False).schema
+            pq.write_table(schema.empty_table(), target)
+    finally:
+        if writer is not None:
+            writer.close()
+    return target
+
+def generate_parquet_from_dummy_data(df):
+    if pa is None:
+        raise RuntimeError("Writing Parquet needs pyarrow; use CSV output instead")
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buffer)
+    return buffer.getvalue()
+
+def parquet_available():
+    return pa is not None
+
+def main():
+    parser = argparse.ArgumentParser(description="Write reproducible dummy data as CSV or Parquet.")
+    parser.add_argument('output', help="Output file; a .parquet suffix writes Parquet, anything else CSV")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--columns', default="Name, Age, Email, Date", help="Comma-separated column names")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    columns = [col.strip() for col in args.columns.split(",") if col.strip()]
+    if args.output.endswith('.parquet'):
+        write_dummy_parquet(args.output, args.rows, columns, args.seed, args.chunk_rows)
+    else:
+        write_dummy_csv(args.output, args.rows, columns, args.seed, args.chunk_rows)
+    print(f"Wrote {args.rows} rows to {args.output}")
+
+if __name__ == '__main__':
+    main()
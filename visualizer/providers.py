@@ -0,0 +1,104 @@
+import os
+import shutil
+import subprocess
+import sys
+import threading
+
+# Data.gov API key
+DATA_GOV_API_KEY = 'fzybhxMQcRYVilL2vl3LDyfrBDThL3gBCwi69S55'
+
+# Function to install Kaggle package
+def install_kaggle():
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "kaggle"])
+
+# Try to import Kaggle API, install if not available
+def import_kaggle_api():
+    try:
+        from kaggle.api.kaggle_api_extended import KaggleApi
+    except ImportError:
+        install_kaggle()
+        from kaggle.api.kaggle_api_extended import KaggleApi
+    return KaggleApi
+
+# Copy the kaggle.json file to the correct location
+def setup_kaggle_api():
+    kaggle_json_src = os.path.join(os.path.dirname(__file__), 'kaggle.json')
+    kaggle_dir = os.path.expanduser('~/.kaggle')
+    kaggle_json_dest = os.path.join(kaggle_dir, 'kaggle.json')
+
+    if not os.path.exists(kaggle_json_src):
+        raise FileNotFoundError(f"Could not find {kaggle_json_src}. Ensure the kaggle.json file is present in the specified location.")
+
+    if not os.path.exists(kaggle_dir):
+        os.makedirs(kaggle_dir)
+
+    shutil.copy(kaggle_json_src, kaggle_json_dest)
+    os.chmod(kaggle_json_dest, 0o600)  # Set appropriate permissions
+
+class KaggleProvider:
+    def __init__(self):
+        # The package import, credential copy and authentication all happen on first use
+        KaggleApi = import_kaggle_api()
+        setup_kaggle_api()
+        self.api = KaggleApi()
+        self.api.authenticate()
+
+    def search(self, query):
+        datasets = self.api.dataset_list(search=query)
+        return [(dataset.ref, dataset.title) for dataset in datasets]
+
+    def download(self, dataset_ref, download_path):
+        self.api.dataset_download_files(dataset_ref, path=download_path, unzip=True)
+        for file in os.listdir(download_path):
+            if file.endswith(".csv"):
+                return os.path.join(download_path, file)
+        return None
+
+class DataGovProvider:
+    def __init__(self, api_key=DATA_GOV_API_KEY):
+        from scripts import http_client
+        self.http_client = http_client
+        self.headers = {"X-Api-Key": api_key}
+
+    def search(self, query):
+        response = self.http_client.get("https://catalog.data.gov/api/3/action/package_search", params={"q": query}, headers=self.headers)
+        response.raise_for_status()
+        results = response.json()["result"]["results"]
+        return [(dataset["id"], dataset["title"]) for dataset in results]
+
+    def download(self, dataset_id, download_path):
+        response = self.http_client.get("https://catalog.data.gov/api/3/action/package_show", params={"id": dataset_id}, headers=self.headers)
+        response.raise_for_status()
+        resources = response.json()["result"]["resources"]
+        for resource in resources:
+            if resource["format"].lower() == "csv":
+                with self.http_client.get(resource["url"], stream=True) as csv_response:
+                    csv_response.raise_for_status()
+                    with open(download_path, "wb") as file:
+                        for chunk in csv_response.iter_content(chunk_size=1 << 16):
+                            file.write(chunk)
+                return download_path
+        return None
+
+# Registered data sources; a client is only created the first time its source is used
+PROVIDERS = {
+    "Kaggle": KaggleProvider,
+    "Data.gov": DataGovProvider
+}
+
+_instances = {}
+_lock = threading.Lock()
+
+def provider_names():
+    return list(PROVIDERS)
+
+def get_provider(name):
+    provider = _instances.get(name)
+    if provider is None:
+        with _lock:
+            provider = _instances.get(name)
+            if provider is None:
+                if name not in PROVIDERS:
+                    raise KeyError(f"Unknown data source: {name}")
+                provider = _instances[name] = PROVIDERS[name]()
+    return provider
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+# Defaults for the dashboard; the point budget can be changed per chart in the UI
+POINT_BUDGET = 5000
+BAR_TOP_K = 50
+OTHERS_LABEL = 'Others'
+
+def axis_values(series):
+    # Numeric view of an axis for the geometry below, or None if it has no natural order
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.astype('int64').to_numpy(dtype='float64')
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype='float64')
+    return None
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: returns the indices of threshold points that keep the
+    # visual shape of the line. The first and last points are always kept.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = (np.floor(np.arange(threshold - 1) * ((n - 2) / (threshold - 2))) + 1).astype(np.int64)
+    edges[-1] = n - 1
+    # Averages of every bucket at once; bucket i is chosen against the average of bucket i + 1
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    next_x = np.append(sums_x[1:] / sizes[1:], x[n - 1])
+    next_y = np.append(sums_y[1:] / sizes[1:], y[n - 1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs((x[a] - next_x[i]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def reduce_line(df, x_column, y_column, budget=POINT_BUDGET):
+    # Returns (frame, reduced) with at most budget rows, ordered along the x axis
+    frame = df[[x_column, y_column]].dropna(subset=[y_column]) if x_column != y_column else df[[x_column]].dropna()
+    if len(frame) <= budget:
+        return frame, False
+    x = axis_values(frame[x_column])
+    if x is None or np.isnan(x).any():
+        # Categorical axis: keep the row order and bucket by position
+        x = np.arange(len(frame), dtype='float64')
+    else:
+        order = np.argsort(x, kind='stable')
+        frame = frame.iloc[order]
+        x = x[order]
+    y = frame[y_column].to_numpy(dtype='float64')
+    return frame.iloc[lttb(x, y, budget)], True
+
+def reduce_scatter(df, x_column, y_column, budget=POINT_BUDGET, count_column='count'):
+    # Bins points onto a grid of at most budget cells; each cell becomes one point at the
+    # mean of its members, with the member count for a density colour scale
+    frame = df[[x_column, y_column]].dropna() if x_column != y_column else df[[x_column]].dropna()
+    if len(frame) <= budget:
+        return frame, False
+    x = axis_values(frame[x_column])
+    y = axis_values(frame[y_column])
+    if x is None or y is None:
+        return frame.sample(n=budget, random_state=0).sort_index(), True
+    side = max(int(np.sqrt(budget)), 1)
+    cells = _bin(x, side) * side + _bin(y, side)
+    grouped = pd.DataFrame({'cell': cells, 'x': x, 'y': y}).groupby('cell', sort=False)
+    binned = grouped.agg(x=('x', 'mean'), y=('y', 'mean'), count=('x', 'size'))
+    result = pd.DataFrame({
+        x_column: _restore(binned['x'].to_numpy(), frame[x_column]),
+        y_column: _restore(binned['y'].to_numpy(), frame[y_column]),
+        count_column: binned['count'].to_numpy()
+    })
+    return result, True
+
+def _bin(values, side):
+    low, high = values.min(), values.max()
+    if high == low:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.minimum(((values - low) / (high - low) * side).astype(np.int64), side - 1)
+
+def _restore(values, original):
+    if pd.api.types.is_datetime64_any_dtype(original):
+        restored = pd.to_datetime(values.astype('int64'))
+        if original.dt.tz is not None:
+            restored = restored.tz_localize('UTC').tz_convert(original.dt.tz)
+        return restored
+    return values
+
+def reduce_bar(df, x_column, y_column, top_k=BAR_TOP_K, budget=POINT_BUDGET, others_label=OTHERS_LABEL, count_column='count'):
+    # Sums y per category and keeps the top_k - 1 largest, folding the rest into one bar.
+    # With the same column on both axes each bar is a value count, held in count_column;
+    # the bar heights are always the last column of the returned frame.
+    if x_column == y_column:
+        value_column = count_column
+        totals = df[x_column].value_counts(sort=False).rename(count_column).rename_axis(x_column)
+        if len(totals) <= top_k:
+            return totals.reset_index(), False
+    else:
+        value_column = y_column
+        frame = df[[x_column, y_column]]
+        if len(frame) <= min(budget, top_k):
+            return frame, False
+        totals = frame.groupby(x_column, sort=False, observed=True)[y_column].sum()
+        if len(totals) <= top_k:
+            if len(frame) <= budget:
+                return frame, False
+            return totals.reset_index(), True
+    keep = totals.nlargest(top_k - 1)
+    others = totals.drop(keep.index).sum()
+    labels = keep.index.astype(object).tolist() + [others_label]
+    return pd.DataFrame({x_column: labels, value_column: np.append(keep.to_numpy(), others)}), True
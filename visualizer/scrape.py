@@ -5,38 +5,63 @@ import sys
 import argparse
 import json
 import os
-from bs4 import BeautifulSoup
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Setup logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from scripts import http_client, metrics
+from scripts.extraction import PAGE_FIELDS, collect_fields, compile_fields, decode_chunks, extract_stream
+from scripts.frontier import Frontier, FAILED
+from scripts.robots_cache import robots_cache
+from scripts.utils import LOG_FORMAT, queue_logging
+
+CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.json'))
+
+# Setup logging; records are written from a background thread so workers never block on it
+stderr_handler = logging.StreamHandler()
+stderr_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setLevel(logging.INFO)
-console_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+console_formatter = logging.Formatter(LOG_FORMAT)
 console_handler.setFormatter(console_formatter)
-logging.getLogger().addHandler(console_handler)
+queue_logging([stderr_handler, console_handler])
 
-def scrape_data(url, output_file):
+# Field selectors come from the "extraction" -> "page" map in config/config.json
+def load_page_fields(config_path=CONFIG_PATH):
     try:
-        response = requests.get(url)
+        with open(config_path, 'r') as f:
+            return json.load(f).get('extraction', {}).get('page', PAGE_FIELDS)
+    except (OSError, ValueError):
+        return PAGE_FIELDS
+
+page_fields = compile_fields(load_page_fields())
+
+def scrape_page(url):
+    with http_client.get(url, stream=True) as response:
         response.raise_for_status()
+        # Parse while the body downloads: one pass, no tree, fields in document order.
+        # Bytes are decoded here so a page without a header charset honors its <meta charset>.
+        chunks = decode_chunks(response.iter_content(chunk_size=1 << 16), http_client.response_charset(response))
+        with metrics.stage('extract', 'scrape'):
+            data = collect_fields(extract_stream(chunks, page_fields), page_fields)
 
-        # Parse the HTML content
-        soup = BeautifulSoup(response.content, 'html.parser')
+    if 'title' in data and data['title'] is None:
+        data['title'] = 'No title'
+    if 'meta_description' in data and data['meta_description'] is None:
+        data['meta_description'] = 'No description'
+    return data
 
-        # Extract data based on the structure of the website
-        data = {
-            'title': soup.title.string if soup.title else 'No title',
-            'meta_description': soup.find('meta', attrs={'name': 'description'})['content'] if soup.find('meta', attrs={'name': 'description'}) else 'No description',
-            'headings': [heading.text for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])],
-            'paragraphs': [p.text for p in soup.find_all('p')],
-            # Add more fields as needed based on what you want to scrape
-        }
+def scrape_data(url, output_file):
+    try:
+        data = scrape_page(url)
 
         directory = os.path.dirname(output_file)
         os.makedirs(directory, exist_ok=True)
 
         # Save data to JSON file
-        with open(output_file, 'w') as file:
+        with metrics.stage('persist', 'scrape'), open(output_file, 'w') as file:
             json.dump(data, file, indent=4)
 
         logging.info("Data scraped successfully and saved to %s", output_file)
@@ -45,13 +70,170 @@ def scrape_data(url, output_file):
     except Exception as e:
         logging.error("An error occurred: %s", str(e))
 
+def read_urls(source):
+    # One URL per line from a file, or from stdin when source is "-"
+    stream = sys.stdin if source == '-' else open(source, 'r')
+    try:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+class HostLimiter:
+    """Caps how many requests run against one host at a time."""
+
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+        return semaphore
+
+def scrape_record(url, host_limiter, respect_robots):
+    start = time.monotonic()
+    with host_limiter.slot(url):
+        try:
+            if respect_robots:
+                if not robots_cache.can_fetch(url):
+                    return {'url': url, 'status': 'disallowed'}
+                robots_cache.wait(url)
+            data = scrape_page(url)
+            return {'url': url, 'status': 'ok', 'elapsed': round(time.monotonic() - start, 3), 'data': data}
+        except Exception as e:
+            return {'url': url, 'status': 'error', 'elapsed': round(time.monotonic() - start, 3), 'error': str(e)}
+
+def iter_claimed(frontier, batch_size):
+    while True:
+        claimed = frontier.claim(batch_size)
+        if not claimed:
+            return
+        for url, _ in claimed:
+            yield url
+
+def written_urls(path):
+    # URLs already in an NDJSON output file; a last line cut short by a crash is removed
+    urls = set()
+    if not os.path.exists(path):
+        return urls
+    with open(path, 'rb+') as f:
+        complete = 0
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            complete += len(line)
+            try:
+                urls.add(json.loads(line)['url'])
+            except (ValueError, KeyError, TypeError):
+                continue
+        f.truncate(complete)
+    return urls
+
+def scrape_batch(urls, output_file, concurrency=8, per_host=2, respect_robots=True, frontier=None):
+    # Keeps at most 2 * concurrency URLs in flight and writes one JSON line per page as it finishes.
+    # With a frontier, progress is checkpointed per URL and a rerun resumes where it stopped.
+    host_limiter = HostLimiter(per_host)
+    counts = {'ok': 0, 'error': 0, 'disallowed': 0}
+    # URLs with a record in the output; a resumed batch skips them, so no page is written twice
+    written = set()
+    if output_file == '-':
+        out = sys.stdout
+    else:
+        directory = os.path.dirname(output_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if frontier is not None:
+            written = written_urls(output_file)
+        out = open(output_file, 'a' if frontier is not None else 'w', encoding='utf-8')
+
+    def write(futures):
+        finished = []
+        for future in futures:
+            record = future.result()
+            if frontier is not None and record['status'] == 'error':
+                # Retried later in this run; only the final failure is reported
+                if frontier.mark_failed(record['url'], record['error']) != FAILED:
+                    continue
+            counts[record['status']] += 1
+            metrics.increment('pages', component='scrape', outcome=record['status'])
+            if frontier is not None:
+                if record['status'] != 'error':
+                    finished.append(record['url'])
+                if record['url'] in written:
+                    continue
+                written.add(record['url'])
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        out.flush()
+        # Checkpoint only records that reached the file; a crash before this re-scrapes
+        # those pages and the written set keeps them from being appended again
+        for url in finished:
+            frontier.mark_done(url)
+
+    def run(url_iter):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = set()
+            for url in url_iter:
+                pending.add(executor.submit(scrape_record, url, host_limiter, respect_robots))
+                if len(pending) >= concurrency * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    write(done)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                write(done)
+
+    try:
+        if frontier is None:
+            run(urls)
+        else:
+            added = frontier.add(urls)
+            logging.info("Frontier %s: %d new URLs, %s", frontier.path, added, frontier.counts())
+            while frontier.has_pending():
+                run(iter_claimed(frontier, concurrency))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    logging.info("Batch finished: %d ok, %d errors, %d disallowed by robots.txt",
+                 counts['ok'], counts['error'], counts['disallowed'])
+    return counts
+
 def main():
     parser = argparse.ArgumentParser(description='Scrape data from a URL and save it to a file.')
-    parser.add_argument('url', help='The URL to scrape data from.')
-    parser.add_argument('output_file', help='The file to save the scraped data to.')
+    parser.add_argument('url', nargs='?', help='The URL to scrape data from.')
+    parser.add_argument('output_file', help='The file to save the scraped data to (newline-delimited JSON in batch mode, "-" for stdout).')
+    parser.add_argument('--batch', metavar='URL_FILE', help='Scrape every URL listed in URL_FILE ("-" reads stdin).')
+    parser.add_argument('--concurrency', type=int, default=8, help='Pages fetched in parallel in batch mode.')
+    parser.add_argument('--per-host', type=int, default=2, help='Maximum parallel requests to a single host in batch mode.')
+    parser.add_argument('--ignore-robots', action='store_true', help='Do not check robots.txt or honor Crawl-delay in batch mode.')
+    parser.add_argument('--frontier', metavar='DB', help='SQLite checkpoint file; rerunning with the same file resumes the batch.')
+    parser.add_argument('--metrics-summary', metavar='JSON', help='Write per-stage timings and counters for this run to JSON.')
     args = parser.parse_args()
 
-    scrape_data(args.url, args.output_file)
+    if not args.batch and not args.url:
+        parser.error('either a url or --batch is required')
+    try:
+        if args.batch:
+            frontier = Frontier(args.frontier) if args.frontier else None
+            try:
+                scrape_batch(read_urls(args.batch), args.output_file, args.concurrency, args.per_host,
+                             respect_robots=not args.ignore_robots, frontier=frontier)
+            finally:
+                if frontier is not None:
+                    frontier.close()
+        else:
+            scrape_data(args.url, args.output_file)
+    finally:
+        if args.metrics_summary:
+            metrics.write_summary(args.metrics_summary, rate_limits=http_client.rate_limit_stats(),
+                                  robots_cache=robots_cache.stats())
 
 if __name__ == '__main__':
     main()
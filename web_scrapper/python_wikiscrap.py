@@ -1,18 +1,51 @@
-import psycopg2
+from psycopg2 import pool
+from psycopg2.extras import execute_values
 import requests
-from bs4 import BeautifulSoup
+import atexit
 import csv
+import hashlib
+import io
 import logging
 import json
+import os
+import sys
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlparse
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Setting up logging
-logging.basicConfig(filename='scraping.log', level=logging.DEBUG, 
-                    format='%(asctime)s:%(levelname)s:%(message)s')
+from scripts import metrics
+from scripts.extraction import WIKIPEDIA_FIELDS, compile_fields, extract_blocks
+from scripts.frontier import Frontier
+from scripts.response_cache import ResponseCache
+from scripts.utils import setup_logging
+
+# Setting up logging (queued, so the file writes happen off the crawl loop)
+setup_logging('scraping.log', level=logging.DEBUG, fmt='%(asctime)s:%(levelname)s:%(message)s', console=False)
 
 # Load configuration
 with open('config.json', 'r') as f:
     config = json.load(f)
 
+# ETag / Last-Modified cache so scheduled re-scrapes skip unchanged pages
+response_cache = ResponseCache(config.get('cache_dir', 'http_cache'))
+
+# Crawl settings; the defaults scrape only config['url'], one page per run
+crawl_config = config.get('crawl', {})
+FRONTIER_PATH = crawl_config.get('frontier', 'frontier.db')
+MAX_DEPTH = crawl_config.get('max_depth', 0)
+MAX_PAGES = crawl_config.get('max_pages', 1)
+MAX_RETRIES = crawl_config.get('max_retries', 3)
+# Article and category pages are followed; files, talk, special pages etc. are not
+FOLLOW_NAMESPACES = tuple(crawl_config.get('follow_namespaces', ['Category:']))
+LINK_FIELD = '__link__'
+
+# Fields extracted in a single pass; override with "extraction" -> "wikipedia" in config.json
+field_config = dict(config.get('extraction', {}).get('wikipedia', WIKIPEDIA_FIELDS))
+extraction_fields = compile_fields(field_config)
+# Links for crawl discovery come out of the same pass as the content
+field_config[LINK_FIELD] = {'selector': crawl_config.get('link_selector', 'div#mw-content-text a[href]::attr(href)'), 'many': True}
+crawl_fields = compile_fields(field_config)
+
 # PostgreSQL configuration (replace with your actual RDS details)
 pg_config = {
     'dbname': 'scrape-log',
@@ -22,74 +55,311 @@ pg_config = {
     'port': '5432'
 }
 
+# Rows per COPY / execute_values batch and pooled connections kept between scheduled runs
+PG_BATCH_SIZE = config.get('pg_batch_size', 5000)
+PG_POOL_SIZE = config.get('pg_pool_size', 4)
+PG_WRITE_METHOD = config.get('pg_write_method', 'copy')
+# Per-run timings and counters are written here when the run ends
+METRICS_SUMMARY = config.get('metrics_summary', 'scrape_metrics.json')
+
+pg_pool = None
+table_ready = False
+
+def fetch_page(url):
+    # Returns the page HTML, or None when it has not changed since the last stored scrape
+    with metrics.stage('fetch', 'wikiscrap'):
+        response, modified = response_cache.fetch(url)
+    if not modified:
+        logging.info(f"Page not modified since last scrape, skipping: {url}")
+        return None
+    logging.info("Successfully fetched the webpage.")
+    return response.text
+
 def scrape_wikipedia(url):
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        logging.info("Successfully fetched the webpage.")
-        return soup
+        return fetch_page(url)
     except requests.exceptions.HTTPError as err:
         logging.error(f"HTTP error occurred: {err}")
     except Exception as err:
         logging.error(f"An error occurred: {err}")
 
-def extract_data(soup):
+def extract_data(html):
     data = []
     try:
-        # Extracting data (example: headings and paragraphs)
-        for heading in soup.find_all(['h1', 'h2', 'h3']):
-            data.append({'type': 'heading', 'text': heading.text.strip()})
-        for paragraph in soup.find_all('p'):
-            data.append({'type': 'paragraph', 'text': paragraph.text.strip()})
+        # One streaming pass over the page, blocks come out in document order
+        with metrics.stage('extract', 'wikiscrap'):
+            blocks = extract_blocks(html, extraction_fields)
+        for block in blocks:
+            data.append({'type': block['type'], 'text': block['text'].strip()})
         logging.info("Data extraction successful.")
     except Exception as e:
         logging.error(f"Error during data extraction: {e}")
     return data
 
-def save_to_csv(data, output_file):
+def parse_page(html, base_url):
+    data = []
+    links = []
+    with metrics.stage('extract', 'wikiscrap'):
+        blocks = extract_blocks(html, crawl_fields)
+    for block in blocks:
+        if block['type'] == LINK_FIELD:
+            link = discover_link(base_url, block['text'])
+            if link:
+                links.append(link)
+        else:
+            data.append({'type': block['type'], 'text': block['text'].strip()})
+    return data, links
+
+def discover_link(base_url, href):
+    url = urljoin(base_url, href)
+    parsed = urlparse(url)
+    if parsed.netloc != urlparse(base_url).netloc or parsed.query or not parsed.path.startswith('/wiki/'):
+        return None
+    title = parsed.path[len('/wiki/'):]
+    if ':' in title and not title.startswith(FOLLOW_NAMESPACES):
+        return None
+    return parsed._replace(fragment='').geturl()
+
+def annotate_blocks(data, source_url):
+    # Hash each block so re-scrapes only store blocks that are new or whose text changed
+    scraped_at = datetime.now(timezone.utc)
+    blocks = {}
+    for row in data:
+        content_hash = hashlib.sha256(f"{row['type']}\x1f{row['text']}".encode('utf-8')).hexdigest()
+        if content_hash not in blocks:
+            blocks[content_hash] = dict(row, content_hash=content_hash, source_url=source_url, scraped_at=scraped_at)
+    return list(blocks.values())
+
+def save_to_csv(data, output_file, append=False):
     try:
-        with open(output_file, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=['type', 'text'])
-            writer.writeheader()
+        write_header = not append or not os.path.exists(output_file) or os.path.getsize(output_file) == 0
+        with metrics.timer('stage', stage='persist', component='wikiscrap', target='csv'), \
+                open(output_file, 'a' if append else 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['type', 'text'], extrasaction='ignore')
+            if write_header:
+                writer.writeheader()
             for row in data:
                 writer.writerow(row)
         logging.info(f"Data successfully saved to {output_file}")
+        return True
     except Exception as e:
         logging.error(f"Error while saving to CSV: {e}")
+        return False
 
-def save_to_postgresql(data):
-    try:
-        connection = psycopg2.connect(**pg_config)
-        cursor = connection.cursor()
+def get_pg_pool():
+    global pg_pool
+    if pg_pool is None:
+        pg_pool = pool.ThreadedConnectionPool(1, PG_POOL_SIZE, **pg_config)
+        atexit.register(pg_pool.closeall)
+    return pg_pool
+
+def ensure_table(cursor):
+    global table_ready
+    if table_ready:
+        return
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ScrapedData (
+            id SERIAL PRIMARY KEY,
+            type VARCHAR(255),
+            text TEXT
+        )
+    """)
+    # Columns added for incremental runs; rows from older runs keep NULLs and never conflict
+    cursor.execute("""
+        ALTER TABLE ScrapedData
+            ADD COLUMN IF NOT EXISTS source_url TEXT,
+            ADD COLUMN IF NOT EXISTS content_hash CHAR(64),
+            ADD COLUMN IF NOT EXISTS scraped_at TIMESTAMPTZ
+    """)
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS scrapeddata_source_hash_idx
+            ON ScrapedData (source_url, content_hash)
+    """)
+    cursor.connection.commit()
+    table_ready = True
+
+def ensure_stage_table(cursor):
+    # Session-local staging table that COPY fills before the deduplicating insert
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS ScrapedDataStage (
+            type VARCHAR(255),
+            text TEXT,
+            source_url TEXT,
+            content_hash CHAR(64),
+            scraped_at TIMESTAMPTZ
+        ) ON COMMIT DELETE ROWS
+    """)
+
+def iter_batches(rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        yield rows[start:start + batch_size]
+
+# Blocks seen before only get their scrape time refreshed
+UPSERT_CONFLICT = """
+        ON CONFLICT (source_url, content_hash) DO UPDATE
+        SET type = EXCLUDED.type, text = EXCLUDED.text, scraped_at = EXCLUDED.scraped_at
+"""
+
+def row_values(row):
+    return (row['type'], row['text'], row['source_url'], row['content_hash'], row['scraped_at'].isoformat())
+
+def copy_rows(cursor, rows):
+    ensure_stage_table(cursor)
+    # QUOTE_ALL keeps empty strings distinct from NULL in COPY's CSV format
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+    writer.writerows(row_values(row) for row in rows)
+    buffer.seek(0)
+    cursor.copy_expert("""
+        COPY ScrapedDataStage (type, text, source_url, content_hash, scraped_at)
+        FROM STDIN WITH (FORMAT csv)
+    """, buffer)
+    cursor.execute("""
+        INSERT INTO ScrapedData (type, text, source_url, content_hash, scraped_at)
+        SELECT DISTINCT ON (source_url, content_hash) type, text, source_url, content_hash, scraped_at
+        FROM ScrapedDataStage
+        """ + UPSERT_CONFLICT)
+    written = cursor.rowcount
+    cursor.execute("TRUNCATE ScrapedDataStage")
+    return written
+
+def insert_rows(cursor, rows):
+    execute_values(cursor, """
+        INSERT INTO ScrapedData (type, text, source_url, content_hash, scraped_at) VALUES %s
+        """ + UPSERT_CONFLICT, [row_values(row) for row in rows], page_size=len(rows))
+    return cursor.rowcount
+
+def delete_superseded(cursor, rows):
+    # Blocks of a page that are not in its latest scrape were changed or removed on the page
+    hashes = {}
+    for row in rows:
+        hashes.setdefault(row['source_url'], []).append(row['content_hash'])
+    deleted = 0
+    for source_url, page_hashes in hashes.items():
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS ScrapedData (
-                id SERIAL PRIMARY KEY,
-                type VARCHAR(255),
-                text TEXT
-            )
-        """)
-        for row in data:
-            cursor.execute("INSERT INTO ScrapedData (type, text) VALUES (%s, %s)", (row['type'], row['text']))
-        connection.commit()
-        logging.info("Data successfully saved to PostgreSQL database.")
+            DELETE FROM ScrapedData
+            WHERE source_url = %s AND NOT (content_hash::text = ANY(%s::text[]))
+        """, (source_url, page_hashes))
+        deleted += cursor.rowcount
+    return deleted
+
+def save_to_postgresql(data, batch_size=None):
+    batch_size = batch_size or PG_BATCH_SIZE
+    write_rows = insert_rows if PG_WRITE_METHOD == 'values' else copy_rows
+    connection = None
+    broken = False
+    try:
+        connection = get_pg_pool().getconn()
+        with metrics.timer('stage', stage='persist', component='wikiscrap', target='postgresql'):
+            with connection.cursor() as cursor:
+                ensure_table(cursor)
+                written = 0
+                for batch in iter_batches(data, batch_size):
+                    written += write_rows(cursor, batch)
+                # Same transaction, so readers never see a page with old and new blocks mixed
+                deleted = delete_superseded(cursor, data)
+            connection.commit()
+        metrics.increment('rows_upserted', written, component='wikiscrap')
+        metrics.increment('rows_deleted', deleted, component='wikiscrap')
+        logging.info(f"Upserted {written} blocks and removed {deleted} superseded ones in PostgreSQL "
+                     f"(batches of {batch_size}).")
+        return True
     except Exception as e:
-        logging.error(f"Error while connecting to PostgreSQL: {e}")
+        logging.error(f"Error while saving to PostgreSQL: {e}")
+        broken = True
+        # The pooled connection may have been dropped between runs (idle timeout, restart)
+        if connection and not connection.closed:
+            try:
+                connection.rollback()
+            except Exception as rollback_error:
+                logging.error(f"Rollback failed: {rollback_error}")
+        return False
     finally:
         if connection:
-            cursor.close()
-            connection.close()
-            logging.info("PostgreSQL connection is closed")
+            # Failed connections are closed rather than handed to the next run
+            get_pg_pool().putconn(connection, close=broken)
+
+def crawl(frontier, output_file, max_pages=MAX_PAGES, max_depth=MAX_DEPTH):
+    # Breadth-first over the frontier; every page is checkpointed once it is stored
+    fetched = 0
+    while fetched < max_pages:
+        claimed = frontier.claim(1)
+        if not claimed:
+            break
+        url, depth = claimed[0]
+        try:
+            html = fetch_page(url)
+        except Exception as e:
+            logging.error(f"Failed to fetch {url}: {e}")
+            frontier.mark_failed(url, e)
+            metrics.increment('pages', component='wikiscrap', outcome='fetch_failed')
+            continue
+        fetched += 1
+        if html is None:
+            frontier.mark_done(url)
+            metrics.increment('pages', component='wikiscrap', outcome='unchanged')
+            continue
+
+        data, links = parse_page(html, url)
+        data = annotate_blocks(data, url)
+        # The upsert can be repeated safely, the CSV append cannot: rows are appended only
+        # after the page is checkpointed, so a retry or a resumed run never writes them twice
+        if not save_to_postgresql(data):
+            response_cache.discard(url)
+            frontier.mark_failed(url, "Failed to save scraped data")
+            metrics.increment('pages', component='wikiscrap', outcome='save_failed')
+            continue
+        if depth < max_depth:
+            added = frontier.add(links, depth + 1)
+            logging.info(f"Discovered {added} new links on {url}")
+        frontier.mark_done(url)
+        if save_to_csv(data, output_file, append=True):
+            # Only remember the page version once it has been stored everywhere
+            response_cache.commit(url)
+            metrics.increment('pages', component='wikiscrap', outcome='stored')
+        else:
+            # Back to pending; the retry repeats the upsert and appends the rows then
+            response_cache.discard(url)
+            frontier.mark_failed(url, "Failed to save scraped data to CSV")
+            metrics.increment('pages', component='wikiscrap', outcome='save_failed')
+    logging.info(f"Crawl pass finished after {fetched} pages: {frontier.counts()}")
+
+def finish_pass(frontier, pass_file, output_file):
+    # A completed pass replaces the output only if it stored anything; when every page
+    # was unchanged (304) the previous CSV is kept as it is
+    if not frontier.is_finished():
+        return
+    if os.path.exists(pass_file) and os.path.getsize(pass_file) > 0:
+        os.replace(pass_file, output_file)
+        logging.info(f"Crawl pass complete, {output_file} updated")
+    else:
+        if os.path.exists(pass_file):
+            os.remove(pass_file)
+        logging.info(f"Crawl pass complete, nothing changed; keeping {output_file}")
 
 def main():
     url = config['url']
     output_file = config['output_file']
-    
-    soup = scrape_wikipedia(url)
-    if soup:
-        data = extract_data(soup)
-        save_to_csv(data, output_file)
-        save_to_postgresql(data)
+    # Rows of the current pass; survives interrupted runs so a resumed pass keeps appending
+    pass_file = f"{output_file}.partial"
+
+    frontier = Frontier(FRONTIER_PATH, max_retries=MAX_RETRIES)
+    if frontier.is_finished():
+        # The previous run completed: start a fresh pass (unchanged pages cost a 304)
+        frontier.restart()
+        open(pass_file, 'w').close()
+    elif frontier.has_pending() or frontier.recovered:
+        logging.info(f"Resuming crawl from checkpoint {FRONTIER_PATH}: {frontier.counts()}")
+    else:
+        open(pass_file, 'w').close()
+    frontier.add([url])
+    try:
+        crawl(frontier, pass_file)
+        finish_pass(frontier, pass_file, output_file)
+    finally:
+        if METRICS_SUMMARY:
+            metrics.write_summary(METRICS_SUMMARY, frontier=frontier.counts())
+        frontier.close()
 
 if __name__ == "__main__":
     main()
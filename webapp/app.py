@@ -1,24 +1,164 @@
+import hashlib
+import json
 import os
 import sys
+import tempfile
+import threading
+import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import pandas as pd
-from flask import Flask, render_template, request, redirect, flash, jsonify
+from flask import Flask, Response, g, render_template, request, redirect, flash, jsonify, url_for
 from werkzeug.utils import secure_filename
-from scripts.data_processing import load_data, analyze_data, create_sunburst_chart
+from scripts import columnar, metrics
+from scripts.data_processing import analyze_csv, create_sunburst_chart
+from scripts.result_cache import ResultCache
+from scripts.jobs import JobQueue, QueueFull, DONE, FAILED, CANCELLED
 
 app = Flask(__name__)
 app.secret_key = "supersecretkey"
 app.config['UPLOAD_FOLDER'] = 'data'
+# Origins (and asylum countries per origin) shown in the sunburst before grouping into "Other"
+app.config['SUNBURST_TOP_N'] = 20
+# Uploads are stored once per content hash under UPLOAD_FOLDER/uploads while they are
+# analyzed; results are cached by hash, so the file is deleted once no analysis needs it
+app.config['UPLOAD_STORE'] = os.path.join(app.config['UPLOAD_FOLDER'], 'uploads')
+app.config['RESULT_CACHE_BYTES'] = 64 * 1024 * 1024
+# Analysis runs in worker processes so request latency does not depend on the upload size.
+# Set BACKGROUND_JOBS to False to analyze inside the request as before.
+app.config['BACKGROUND_JOBS'] = True
+app.config['JOB_WORKERS'] = 2
+# Uploads queued or running at once; further uploads are turned away until one finishes
+app.config['JOB_QUEUE_SIZE'] = 8
+app.config['JOB_DIR'] = os.path.join(app.config['UPLOAD_FOLDER'], 'jobs')
 ALLOWED_EXTENSIONS = {'csv'}
 
+# data_info / graph_json per upload hash, so re-uploading a file returns immediately
+result_cache = ResultCache(app.config['RESULT_CACHE_BYTES'])
+job_queue = JobQueue(app.config['JOB_WORKERS'], app.config['JOB_QUEUE_SIZE'], app.config['JOB_DIR'])
+# Analyses using each stored upload, by content hash
+upload_users = {}
+upload_lock = threading.Lock()
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def save_upload(file):
+    # Hash while streaming to a private temp file, then move it to <sha256>.csv.
+    # Concurrent uploads never share a path, and identical files end up in the same place.
+    os.makedirs(app.config['UPLOAD_STORE'], exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=app.config['UPLOAD_STORE'], suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in iter(lambda: file.stream.read(1 << 20), b''):
+                digest.update(chunk)
+                out.write(chunk)
+        content_hash = digest.hexdigest()
+        path = os.path.join(app.config['UPLOAD_STORE'], f"{content_hash}.csv")
+        # Under the lock so a concurrent release_upload cannot delete the file just placed
+        with upload_lock:
+            os.replace(tmp_path, path)
+            upload_users[content_hash] = upload_users.get(content_hash, 0) + 1
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return content_hash, path
+
+def release_upload(content_hash, path):
+    # Deletes the stored upload (and its Parquet copy) once its last analysis is done
+    with upload_lock:
+        upload_users[content_hash] -= 1
+        if upload_users[content_hash] > 0:
+            return
+        del upload_users[content_hash]
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    columnar.discard(path)
+
+def analyze_upload(path, top_n, cancel=None):
+    # Streamed in chunks, so memory stays bounded whatever the upload size.
+    # Runs in a worker process in background mode; cancel is that job's CancelToken.
+    # Stage timings travel back with the result because worker metrics are not shared.
+    started = time.perf_counter()
+    data_info, sunburst_df = analyze_csv(path, cancel=cancel)
+    timings = {'parse': time.perf_counter() - started}
+    if data_info is None:
+        return None
+    if sunburst_df is None:
+        return {'data_info': data_info, 'graph_json': None, 'message': 'Required columns are missing in the dataframe',
+                'timings': timings}
+    if cancel is not None:
+        cancel.check()
+    started = time.perf_counter()
+    graph_json = create_sunburst_chart(sunburst_df, top_n)
+    timings['render'] = time.perf_counter() - started
+    return {'data_info': data_info, 'graph_json': graph_json, 'message': None, 'timings': timings}
+
+def record_timings(result):
+    for stage, seconds in (result or {}).pop('timings', {}).items():
+        metrics.observe('stage', seconds, stage=stage, component='webapp')
+
+def cache_result(cache_key, result):
+    record_timings(result)
+    metrics.increment('analyses', outcome='ok' if result is not None else 'error')
+    if result is not None:
+        size = len(result['graph_json'] or '') + len(json.dumps(result['data_info']))
+        result_cache.put(cache_key, result, size)
+
+def start_analysis(file):
+    # Returns (result, job_id): a cached result straight away, otherwise the id of a queued job
+    content_hash, path = save_upload(file)
+    top_n = app.config['SUNBURST_TOP_N']
+    cache_key = (content_hash, top_n)
+    result = result_cache.get(cache_key)
+    if result is not None:
+        metrics.increment('analyses', outcome='cached')
+        release_upload(content_hash, path)
+        return result, None
+    try:
+        job_id = job_queue.submit(analyze_upload, path, top_n,
+                                  on_success=lambda result: cache_result(cache_key, result),
+                                  on_finish=lambda job: release_upload(content_hash, path))
+    except Exception:
+        release_upload(content_hash, path)
+        raise
+    return None, job_id
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    started = g.pop('request_started', None)
+    endpoint = request.endpoint or 'unknown'
+    if started is not None:
+        metrics.observe('http_server_request', time.perf_counter() - started, endpoint=endpoint, method=request.method)
+    metrics.increment('http_server_responses', endpoint=endpoint, status=response.status_code)
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    # Prometheus scrape target; ?format=json returns the same data as a run summary
+    job_stats = job_queue.stats()
+    for status, count in job_stats['jobs'].items():
+        metrics.set_gauge('jobs', count, status=status)
+    metrics.set_gauge('jobs_pending', job_stats['pending'])
+    for name, value in result_cache.stats().items():
+        metrics.set_gauge('result_cache', value, field=name)
+    if request.args.get('format') == 'json':
+        return jsonify(metrics.summary())
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     data_info = None
     graph_json = None
+    job_id = None
 
     if request.method == 'POST':
         if 'file' not in request.files:
@@ -30,16 +170,78 @@ def index():
             return redirect(request.url)
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            file.save(os.path.join(app.config['UPLOAD_FOLDER'], 'uploaded_data.csv'))
-            df = load_data(os.path.join(app.config['UPLOAD_FOLDER'], 'uploaded_data.csv'))
-            if df is not None:
-                data_info = analyze_data(df)
-                graph_json = create_sunburst_chart(df)
+            if app.config['BACKGROUND_JOBS']:
+                try:
+                    result, job_id = start_analysis(file)
+                except QueueFull:
+                    flash('The server is busy analyzing other uploads, please try again shortly')
+                    return redirect(request.url)
             else:
-                flash('Error loading data')
-                return redirect(request.url)
+                content_hash, path = save_upload(file)
+                cache_key = (content_hash, app.config['SUNBURST_TOP_N'])
+                try:
+                    result = result_cache.get(cache_key)
+                    if result is None:
+                        result = analyze_upload(path, app.config['SUNBURST_TOP_N'])
+                        cache_result(cache_key, result)
+                    else:
+                        metrics.increment('analyses', outcome='cached')
+                finally:
+                    release_upload(content_hash, path)
+                if result is None:
+                    flash('Error loading data')
+                    return redirect(request.url)
+            if result is not None:
+                data_info = result['data_info']
+                graph_json = result['graph_json']
+                if result['message']:
+                    flash(result['message'])
+
+    return render_template('index.html', data_info=data_info, graph_json=graph_json, job_id=job_id)
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    file = request.files.get('file')
+    if file is None or file.filename == '' or not allowed_file(file.filename):
+        return jsonify({'error': 'Upload a CSV file in the "file" field'}), 400
+    try:
+        result, job_id = start_analysis(file)
+    except QueueFull as e:
+        return jsonify({'error': f'Job queue is full: {e}'}), 503
+    if result is not None:
+        return jsonify({'status': DONE, 'result': result})
+    return jsonify({'id': job_id, 'status': job_queue.get(job_id).status,
+                    'status_url': url_for('job_status', job_id=job_id),
+                    'result_url': url_for('job_result', job_id=job_id)}), 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    if job.status == DONE:
+        if job.result is None:
+            return jsonify({'status': job.status, 'error': 'Error loading data'}), 422
+        return jsonify({'status': job.status, 'result': job.result})
+    if job.status == FAILED:
+        return jsonify({'status': job.status, 'error': job.error}), 500
+    if job.status == CANCELLED:
+        return jsonify({'status': job.status, 'error': 'Job was cancelled'}), 409
+    return jsonify({'status': job.status}), 202
 
-    return render_template('index.html', data_info=data_info, graph_json=graph_json)
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job.to_dict())
 
 if __name__ == "__main__":
     app.run(debug=True)